@@ -14,10 +14,23 @@ Author: Research Team
 License: MIT
 """
 
+import matplotlib
+matplotlib.use('Agg')  # charts are only saved to file; skip GUI backend init
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
+from matplotlib.transforms import Bbox
 import numpy as np
 import os
+from dataclasses import dataclass
 from datetime import datetime
+from itertools import cycle, islice
+
+# Optional: Numba JIT for the foF2 kernel on large (multi-year, minute-resolution) inputs
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
 
 # Standardized layout configuration
 STANDARD_LAYOUT = {
@@ -30,13 +43,106 @@ STANDARD_LAYOUT = {
     'colors': ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2']
 }
 
-def create_standardized_chart(station_name, period_name, year_range):
-    """Create standardized 2x2 chart with enforced positioning"""
+# Per-batch state for save_standardized_chart (timestamp and folder check done once)
+_SAVE_CTX = {'timestamp': None, 'dir_checked': False}
+
+# Filename cleanup: spaces and hyphens -> underscores in one pass
+FILENAME_TRANS = str.maketrans({' ': '_', '-': '_'})
+
+# Below this many samples the NumPy expression is as fast as the JIT kernel
+NUMBA_MIN_SAMPLES = 100_000
+
+# Station-specific foF2 parameters (matching original scripts):
+# (station, period) -> (baseline_fof2, scale_factor, min_fof2, max_fof2)
+FOF2_PARAMS = {
+    ('Guam', '15th'): (11.0, 10.0, 4.0, 18.0),     # Guam April 15th baseline
+    ('Guam', 'other'): (11.2, 10.0, 4.0, 18.0),    # Guam April 15-28 baseline
+    ('Darwin', '15-28'): (9.2, 12.0, 3.0, 15.0),   # Darwin April 15-28 baseline
+    ('Darwin', 'other'): (8.5, 10.0, 3.0, 15.0),   # Darwin general baseline
+}
+
+@dataclass
+class ChartData:
+    """
+    NumPy view of one chart's data, extracted from the DataFrame once
+    signals is (years, samples) in C order so each year's row is contiguous
+    """
+    hour: np.ndarray
+    day: np.ndarray
+    minute: np.ndarray
+    signals: np.ndarray
+    year_labels: list
     
+    @classmethod
+    def from_df(cls, df, year_columns):
+        """Convert a DataFrame with DateTime and per-year signal columns"""
+        dt = df['DateTime'].dt
+        return cls(hour=dt.hour.to_numpy(dtype=np.int8),
+                   day=dt.day.to_numpy(dtype=np.int8),
+                   minute=dt.minute.to_numpy(dtype=np.int8),
+                   signals=np.ascontiguousarray(df[year_columns].to_numpy(dtype=np.float64).T),
+                   year_labels=list(year_columns))
+    
+    def fof2_by_year(self, station="Guam", period="April"):
+        """{year: foF2 array} for all years (NaN where no signal)"""
+        return dict(zip(self.year_labels, estimate_fof2(self.signals, station, period)))
+
+def as_chart_data(data, year_columns):
+    """Accept either a ChartData or a DataFrame (converted once)"""
+    if isinstance(data, ChartData):
+        return data
+    return ChartData.from_df(data, year_columns)
+
+class ChartCanvas:
+    """
+    Reusable 2x2 figure for batch chart generation
+    Creating a Figure and four Axes per chart is expensive; a canvas is built
+    once per axis layout (hour axis shared or not) and cleared between charts instead
+    """
+    
+    def __init__(self):
+        self.figures = {}
+    
+    def reset(self, main_title, share_hours=False):
+        """Clear all four panels and set the new main title"""
+        if share_hours not in self.figures:
+            self.figures[share_hours] = new_chart_axes(share_hours)
+        fig, axes = self.figures[share_hours]
+        for ax in axes.flat:
+            ax.cla()
+            # cla() keeps the old data limits; axvspan would then autoscale y to the previous chart
+            ax.dataLim.set(Bbox.null())
+        fig.suptitle(main_title,
+                     fontsize=STANDARD_LAYOUT['title_fontsize'],
+                     fontweight='bold',
+                     y=0.98)
+        return fig, axes
+    
+    def close(self):
+        """Close every figure held by the canvas"""
+        for fig, _ in self.figures.values():
+            plt.close(fig)
+        self.figures.clear()
+
+def new_chart_axes(share_hours=False):
+    """
+    Create the 2x2 figure; with share_hours the temporal panel (1,0) shares the
+    hourly panel's (0,0) hour-of-day x axis, so ticks are laid out once
+    """
     fig, axes = plt.subplots(2, 2, figsize=STANDARD_LAYOUT['figure_size'])
+    if share_hours:
+        axes[1, 0].sharex(axes[0, 0])
+    return fig, axes
+
+def create_standardized_chart(station_name, period_name, year_range, canvas=None, share_hours=False):
+    """Create standardized 2x2 chart with enforced positioning (reusing canvas if given)"""
     
     # Standardized main title with proper spacing
     main_title = f'Ionospheric foF2 Critical Frequency Analysis\n{station_name} Station - {period_name} ({year_range})'
+    if canvas is not None:
+        return canvas.reset(main_title, share_hours)
+    
+    fig, axes = new_chart_axes(share_hours)
     fig.suptitle(main_title,
                 fontsize=STANDARD_LAYOUT['title_fontsize'],
                 fontweight='bold',
@@ -44,74 +150,110 @@ def create_standardized_chart(station_name, period_name, year_range):
     
     return fig, axes
 
-def plot_hourly_patterns(ax, df, year_columns, colors, title="Hourly Patterns (24h Diurnal Cycle)"):
+def plot_hourly_patterns(ax, data, year_columns, colors, title="Hourly Patterns (24h Diurnal Cycle)", fof2_cache=None):
     """POSITION: Top-Left (0,0) - ALWAYS hourly patterns"""
     
+    data = as_chart_data(data, year_columns)
+    year_columns = data.year_labels
+    if fof2_cache is None:
+        fof2_cache = data.fof2_by_year()
+    year_colors = list(islice(cycle(colors), len(year_columns)))
+    
     # Add day/night shading first
-    ax.axvspan(6, 18, alpha=0.15, color='yellow', label='Daylight')
-    ax.axvspan(18, 24, alpha=0.15, color='gray', label='Night')
-    ax.axvspan(0, 6, alpha=0.15, color='gray')
-    
-    # Plot hourly data for each year
-    for i, year in enumerate(year_columns):
-        df_year = df.dropna(subset=[year])
-        df_year['Hour'] = df_year['DateTime'].dt.hour
-        df_year['foF2_estimated'] = calculate_fof2_from_signal(df_year[year])
-        hourly_fof2 = df_year.groupby('Hour')['foF2_estimated'].mean()
-        
-        ax.plot(hourly_fof2.index, hourly_fof2.values,
-                color=colors[i % len(colors)], marker='o', linewidth=2, markersize=4,
-                label=f'{int(year)}')
+    ax.axvspan(6, 18, alpha=0.15, color='yellow', label='Daylight', rasterized=True)
+    ax.axvspan(18, 24, alpha=0.15, color='gray', label='Night', rasterized=True)
+    ax.axvspan(0, 6, alpha=0.15, color='gray', rasterized=True)
+    
+    hour_arr = data.hour
+    
+    # Hourly curve for each year
+    segments = []
+    for year in year_columns:
+        fof2 = fof2_cache[year]
+        mask = ~np.isnan(fof2)
+        hours, hourly_fof2 = bincount_mean(hour_arr[mask], fof2[mask], minlength=24)
+        segments.append(np.column_stack([hours, hourly_fof2]))
+    
+    # Draw all years as one LineCollection plus one marker scatter instead of a Line2D per year
+    ax.add_collection(LineCollection(segments, colors=year_colors, linewidths=2))
+    points = np.concatenate(segments)
+    point_colors = np.repeat(year_colors, [len(seg) for seg in segments])
+    ax.scatter(points[:, 0], points[:, 1], c=point_colors, s=16, zorder=3)
+    ax.autoscale_view()
     
     # Standardized formatting
-    ax.set_title(title, fontsize=STANDARD_LAYOUT['subtitle_fontsize'], fontweight='bold')
-    ax.set_xlabel('Hour of Day (UTC)', fontsize=STANDARD_LAYOUT['label_fontsize'])
-    ax.set_ylabel('Average foF2 (MHz)', fontsize=STANDARD_LAYOUT['label_fontsize'])
-    ax.legend(loc='upper right', fontsize=STANDARD_LAYOUT['legend_fontsize'])
-    ax.grid(True, alpha=STANDARD_LAYOUT['grid_alpha'])
+    subtitle_fs = STANDARD_LAYOUT['subtitle_fontsize']
+    label_fs = STANDARD_LAYOUT['label_fontsize']
+    legend_fs = STANDARD_LAYOUT['legend_fontsize']
+    grid_alpha = STANDARD_LAYOUT['grid_alpha']
+    ax.set_title(title, fontsize=subtitle_fs, fontweight='bold')
+    ax.set_xlabel('Hour of Day (UTC)', fontsize=label_fs)
+    ax.set_ylabel('Average foF2 (MHz)', fontsize=label_fs)
+    handles, _ = ax.get_legend_handles_labels()
+    handles += [Line2D([0], [0], color=color, marker='o', linewidth=2, markersize=4, label=f'{int(year)}')
+                for year, color in zip(year_columns, year_colors)]
+    ax.legend(handles=handles, loc='upper right', fontsize=legend_fs)
+    ax.grid(True, alpha=grid_alpha)
     ax.set_xlim(0, 23)
     ax.set_xticks(range(0, 24, 6))
 
-def plot_statistical_distribution(ax, df, year_columns, colors, title="foF2 Distribution by Year"):
+def plot_statistical_distribution(ax, data, year_columns, colors, title="foF2 Distribution by Year", fof2_cache=None):
     """POSITION: Top-Right (0,1) - ALWAYS statistical distribution"""
     
+    data = as_chart_data(data, year_columns)
+    year_columns = data.year_labels
+    if fof2_cache is None:
+        fof2_cache = data.fof2_by_year()
+    year_colors = list(islice(cycle(colors), len(year_columns)))
+    
     fof2_data = []
     year_labels = []
     
     for year in year_columns:
-        df_year = df.dropna(subset=[year])
-        fof2_values = calculate_fof2_from_signal(df_year[year])
-        fof2_data.append(fof2_values)
+        fof2_values = fof2_cache[year]
+        fof2_data.append(fof2_values[~np.isnan(fof2_values)])
         year_labels.append(f'{int(year)}')
     
     # Create box plots
     bp = ax.boxplot(fof2_data, tick_labels=year_labels, patch_artist=True)
-    for patch, color in zip(bp['boxes'], colors):
+    for patch, color in zip(bp['boxes'], year_colors):
         patch.set_facecolor(color)
         patch.set_alpha(0.7)
     
     # Standardized formatting
-    ax.set_title(title, fontsize=STANDARD_LAYOUT['subtitle_fontsize'], fontweight='bold')
-    ax.set_xlabel('Year', fontsize=STANDARD_LAYOUT['label_fontsize'])
-    ax.set_ylabel('foF2 (MHz)', fontsize=STANDARD_LAYOUT['label_fontsize'])
-    ax.grid(True, alpha=STANDARD_LAYOUT['grid_alpha'])
+    subtitle_fs = STANDARD_LAYOUT['subtitle_fontsize']
+    label_fs = STANDARD_LAYOUT['label_fontsize']
+    grid_alpha = STANDARD_LAYOUT['grid_alpha']
+    ax.set_title(title, fontsize=subtitle_fs, fontweight='bold')
+    ax.set_xlabel('Year', fontsize=label_fs)
+    ax.set_ylabel('foF2 (MHz)', fontsize=label_fs)
+    ax.grid(True, alpha=grid_alpha)
 
-def plot_temporal_progression(ax, df, year_columns, colors, period_type="daily"):
+def plot_temporal_progression(ax, data, year_columns, colors, period_type="daily", fof2_cache=None):
     """POSITION: Bottom-Left (1,0) - ALWAYS temporal progression"""
     
+    data = as_chart_data(data, year_columns)
+    year_columns = data.year_labels
+    if fof2_cache is None:
+        fof2_cache = data.fof2_by_year()
+    year_colors = list(islice(cycle(colors), len(year_columns)))
+    
+    hour_arr = data.hour
+    day_arr = data.day
+    minute_arr = data.minute
+    masks = {year: ~np.isnan(fof2_cache[year]) for year in year_columns}
+    
     if period_type == "daily":
         # Daily progression for multi-day periods
         title = "Daily Average foF2 Progression"
         xlabel = "Day of Period"
         
-        for i, year in enumerate(year_columns):
-            df_year = df.dropna(subset=[year])
-            df_year['Day'] = df_year['DateTime'].dt.day
-            df_year['foF2_estimated'] = calculate_fof2_from_signal(df_year[year])
-            daily_fof2 = df_year.groupby('Day')['foF2_estimated'].mean()
+        for year, color in zip(year_columns, year_colors):
+            mask = masks[year]
+            days, daily_fof2 = bincount_mean(day_arr[mask], fof2_cache[year][mask], minlength=32)
             
-            ax.plot(daily_fof2.index, daily_fof2.values,
-                    color=colors[i % len(colors)], marker='o', linewidth=2, markersize=4,
+            ax.plot(days, daily_fof2,
+                    color=color, marker='o', linewidth=2, markersize=4,
                     label=f'{int(year)}')
     
     elif period_type == "single_day":
@@ -119,61 +261,73 @@ def plot_temporal_progression(ax, df, year_columns, colors, period_type="daily")
         title = "24-hour foF2 Progression"
         xlabel = "Hour of Day"
         
-        for i, year in enumerate(year_columns):
-            df_year = df.dropna(subset=[year])
-            df_year['Hour'] = df_year['DateTime'].dt.hour
-            df_year['Minute'] = df_year['DateTime'].dt.minute
-            df_year['HourDecimal'] = df_year['Hour'] + df_year['Minute'] / 60.0
-            df_year['foF2_estimated'] = calculate_fof2_from_signal(df_year[year])
-            df_year = df_year.sort_values('HourDecimal')
+        hour_decimal = hour_arr + minute_arr / 60.0
+        for year, color in zip(year_columns, year_colors):
+            mask = masks[year]
+            year_hours = hour_decimal[mask]
+            order = np.argsort(year_hours)
             
-            ax.plot(df_year['HourDecimal'], df_year['foF2_estimated'],
-                    color=colors[i % len(colors)], marker='o', linewidth=2, markersize=3,
+            ax.plot(year_hours[order], fof2_cache[year][mask][order],
+                    color=color, marker='o', linewidth=2, markersize=3,
                     label=f'{int(year)}')
+        
+        # Hour axis shared with the hourly panel: show the whole day on both
+        if len(ax.get_shared_x_axes().get_siblings(ax)) > 1:
+            ax.set_xlim(0, 24)
     
     elif period_type == "monthly":
         # Monthly progression for full month analysis
         title = "Daily Average foF2 Progression (Full Month)"
         xlabel = "Day of April"
         
-        for i, year in enumerate(year_columns):
-            df_year = df.dropna(subset=[year])
-            df_year['Day'] = df_year['DateTime'].dt.day
-            df_year['foF2_estimated'] = calculate_fof2_from_signal(df_year[year])
-            daily_fof2 = df_year.groupby('Day')['foF2_estimated'].mean()
+        for year, color in zip(year_columns, year_colors):
+            mask = masks[year]
+            days, daily_fof2 = bincount_mean(day_arr[mask], fof2_cache[year][mask], minlength=32)
             
-            ax.plot(daily_fof2.index, daily_fof2.values,
-                    color=colors[i % len(colors)], marker='o', linewidth=2, markersize=4,
+            ax.plot(days, daily_fof2,
+                    color=color, marker='o', linewidth=2, markersize=4,
                     label=f'{int(year)}')
     
     # Standardized formatting
-    ax.set_title(title, fontsize=STANDARD_LAYOUT['subtitle_fontsize'], fontweight='bold')
-    ax.set_xlabel(xlabel, fontsize=STANDARD_LAYOUT['label_fontsize'])
-    ax.set_ylabel('Average foF2 (MHz)', fontsize=STANDARD_LAYOUT['label_fontsize'])
-    ax.legend(loc='upper right', fontsize=STANDARD_LAYOUT['legend_fontsize'])
-    ax.grid(True, alpha=STANDARD_LAYOUT['grid_alpha'])
+    subtitle_fs = STANDARD_LAYOUT['subtitle_fontsize']
+    label_fs = STANDARD_LAYOUT['label_fontsize']
+    legend_fs = STANDARD_LAYOUT['legend_fontsize']
+    grid_alpha = STANDARD_LAYOUT['grid_alpha']
+    ax.set_title(title, fontsize=subtitle_fs, fontweight='bold')
+    ax.set_xlabel(xlabel, fontsize=label_fs)
+    ax.set_ylabel('Average foF2 (MHz)', fontsize=label_fs)
+    ax.legend(loc='upper right', fontsize=legend_fs)
+    ax.grid(True, alpha=grid_alpha)
 
-def plot_nvis_frequency_bands(ax, df, year_columns, title="foF2 vs NVIS Frequency Bands"):
+def plot_nvis_frequency_bands(ax, data, year_columns, title="foF2 vs NVIS Frequency Bands", fof2_cache=None):
     """POSITION: Bottom-Right (1,1) - ALWAYS NVIS frequency bands"""
     
-    # Calculate overall average foF2
-    all_fof2_combined = []
-    for year in year_columns:
-        df_year = df.dropna(subset=[year])
-        fof2_values = calculate_fof2_from_signal(df_year[year])
-        all_fof2_combined.extend(fof2_values)
+    data = as_chart_data(data, year_columns)
     
-    avg_fof2_combined = np.mean(all_fof2_combined)
-    std_fof2_combined = np.std(all_fof2_combined)
+    # Calculate overall average foF2, accumulating per year (no concatenation)
+    total, total_sq, n = 0.0, 0.0, 0
+    for i, year in enumerate(data.year_labels):
+        if fof2_cache is None:
+            year_n, year_total, year_total_sq = fof2_moments(data.signals[i])
+        else:
+            fof2_values = fof2_cache[year]
+            fof2_values = fof2_values[~np.isnan(fof2_values)]
+            year_n, year_total, year_total_sq = fof2_values.size, fof2_values.sum(), np.dot(fof2_values, fof2_values)
+        total += year_total
+        total_sq += year_total_sq
+        n += year_n
+    
+    avg_fof2_combined = total / n
+    std_fof2_combined = np.sqrt(max(total_sq / n - avg_fof2_combined * avg_fof2_combined, 0.0))
     
     # Plot foF2 range
     ax.axhspan(avg_fof2_combined - std_fof2_combined, avg_fof2_combined + std_fof2_combined,
-                alpha=0.3, color='blue', label=f'foF2: {avg_fof2_combined:.1f}±{std_fof2_combined:.1f} MHz')
+                alpha=0.3, color='blue', label=f'foF2: {avg_fof2_combined:.1f}±{std_fof2_combined:.1f} MHz', rasterized=True)
     ax.axhline(y=avg_fof2_combined, color='blue', linewidth=2)
     
     # Add NVIS frequency bands
-    ax.axhspan(2, 8, alpha=0.2, color='lightgray', label='Night NVIS (2-8 MHz)')
-    ax.axhspan(8, 15, alpha=0.2, color='lightcoral', label='Day NVIS (8-15 MHz)')
+    ax.axhspan(2, 8, alpha=0.2, color='lightgray', label='Night NVIS (2-8 MHz)', rasterized=True)
+    ax.axhspan(8, 15, alpha=0.2, color='lightcoral', label='Day NVIS (8-15 MHz)', rasterized=True)
     
     # Add DGFC frequencies
     ax.axhline(y=7.078, color='red', linewidth=2, linestyle='--', label='DGFC 7.078 MHz')
@@ -185,11 +339,15 @@ def plot_nvis_frequency_bands(ax, df, year_columns, title="foF2 vs NVIS Frequenc
                label=f'MUF: {muf_combined:.1f} MHz')
     
     # Standardized formatting
-    ax.set_title(title, fontsize=STANDARD_LAYOUT['subtitle_fontsize'], fontweight='bold')
-    ax.set_ylabel('Frequency (MHz)', fontsize=STANDARD_LAYOUT['label_fontsize'])
-    ax.set_xlabel('NVIS Analysis', fontsize=STANDARD_LAYOUT['label_fontsize'])
-    ax.legend(loc='upper left', fontsize=STANDARD_LAYOUT['legend_fontsize'])
-    ax.grid(True, alpha=STANDARD_LAYOUT['grid_alpha'])
+    subtitle_fs = STANDARD_LAYOUT['subtitle_fontsize']
+    label_fs = STANDARD_LAYOUT['label_fontsize']
+    legend_fs = STANDARD_LAYOUT['legend_fontsize']
+    grid_alpha = STANDARD_LAYOUT['grid_alpha']
+    ax.set_title(title, fontsize=subtitle_fs, fontweight='bold')
+    ax.set_ylabel('Frequency (MHz)', fontsize=label_fs)
+    ax.set_xlabel('NVIS Analysis', fontsize=label_fs)
+    ax.legend(loc='upper left', fontsize=legend_fs)
+    ax.grid(True, alpha=grid_alpha)
     ax.set_ylim(0, max(25, muf_combined + 5))
     ax.set_xlim(-0.5, 0.5)
     ax.set_xticks([])
@@ -199,59 +357,110 @@ def calculate_fof2_from_signal(signal_values, station="Guam", period="April"):
     Calculate foF2 from signal strength values using station-specific parameters
     This matches the original script calculations exactly
     """
-    fof2_values = []
+    signal = np.asarray(signal_values, dtype=np.float64)
+    return estimate_fof2(signal[~np.isnan(signal)], station, period)
 
-    # Station-specific baselines (matching original scripts)
+def fof2_params(station, period):
+    """Look up (baseline, scale, min, max) for a station/period"""
     if "Guam" in station:
-        if "15th" in period:
-            baseline_fof2 = 11.0  # Guam April 15th baseline
-        else:
-            baseline_fof2 = 11.2  # Guam April 15-28 baseline
-        scale_factor = 10.0
-        min_fof2, max_fof2 = 4.0, 18.0
-    else:  # Darwin
-        if "15-28" in period:
-            baseline_fof2 = 9.2  # Darwin April 15-28 baseline
-            scale_factor = 12.0
-        else:
-            baseline_fof2 = 8.5  # Darwin general baseline
-            scale_factor = 10.0
-        min_fof2, max_fof2 = 3.0, 15.0
+        return FOF2_PARAMS[('Guam', '15th' if '15th' in period else 'other')]
+    return FOF2_PARAMS[('Darwin', '15-28' if '15-28' in period else 'other')]
+
+def estimate_fof2(signal, station="Guam", period="April"):
+    """Vectorized foF2 estimate; NaN signal values stay NaN"""
+    baseline_fof2, scale_factor, min_fof2, max_fof2 = fof2_params(station, period)
+    signal = np.asarray(signal, dtype=np.float64)
+    if njit is not None and signal.size >= NUMBA_MIN_SAMPLES:
+        signal = np.ascontiguousarray(signal)
+        fof2 = _fof2_kernel(signal.ravel(), baseline_fof2, scale_factor, min_fof2, max_fof2)
+        return fof2.reshape(signal.shape)
+    # Use original calculation method, clamped to reasonable foF2 range
+    return np.clip(baseline_fof2 + signal / scale_factor, min_fof2, max_fof2)
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _fof2_kernel(signal, baseline_fof2, scale_factor, min_fof2, max_fof2):
+        """Fused divide/add/clamp in one pass; no fastmath so NaN stays NaN"""
+        fof2 = np.empty_like(signal)
+        for i in prange(signal.size):
+            v = baseline_fof2 + signal[i] / scale_factor
+            fof2[i] = min_fof2 if v < min_fof2 else (max_fof2 if v > max_fof2 else v)
+        return fof2
 
-    for signal in signal_values:
-        if pd.notna(signal):
-            # Use original calculation method
-            signal_factor = signal / scale_factor
-            estimated_fof2 = baseline_fof2 + signal_factor
+def fof2_moments(signal, station="Guam", period="April"):
+    """(count, sum, sum of squares) of foF2 over the non-NaN samples of a raw signal array"""
+    if njit is not None and signal.size >= NUMBA_MIN_SAMPLES:
+        return _fof2_reduce(signal, *fof2_params(station, period))
+    fof2_values = calculate_fof2_from_signal(signal, station, period)
+    return fof2_values.size, fof2_values.sum(), np.dot(fof2_values, fof2_values)
 
-            # Clamp to reasonable foF2 range
-            estimated_fof2 = np.clip(estimated_fof2, min_fof2, max_fof2)
-            fof2_values.append(estimated_fof2)
+if njit is not None:
+    @njit(cache=True)
+    def _fof2_reduce(signal, baseline_fof2, scale_factor, min_fof2, max_fof2):
+        """foF2 estimate fused with the count/sum/sum-of-squares reduction; no temporaries"""
+        n = 0
+        total = 0.0
+        total_sq = 0.0
+        for i in range(signal.size):
+            v = signal[i]
+            if v == v:  # skip NaN
+                f = baseline_fof2 + v / scale_factor
+                f = min_fof2 if f < min_fof2 else (max_fof2 if f > max_fof2 else f)
+                n += 1
+                total += f
+                total_sq += f * f
+        return n, total, total_sq
+
+def precompute_fof2(df, year_columns, station="Guam", period="April"):
+    """
+    Compute foF2 for every year once so all four panels can share it
+    Returns {year: array} with each array aligned to df's rows (NaN where no signal)
+    """
+    signals = df[year_columns].to_numpy(dtype=np.float64)
+    fof2 = estimate_fof2(signals, station, period)
+    return {year: fof2[:, i] for i, year in enumerate(year_columns)}
 
-    return fof2_values
+def bincount_mean(keys, values, minlength):
+    """Mean of values per small integer key (hour/day); returns only populated keys"""
+    counts = np.bincount(keys, minlength=minlength)
+    sums = np.bincount(keys, weights=values, minlength=minlength)
+    populated = np.flatnonzero(counts)
+    return populated, sums[populated] / counts[populated]
 
 def apply_standardized_layout(fig):
-    """Apply final standardized layout adjustments"""
-    plt.tight_layout()
-    plt.subplots_adjust(top=0.88, hspace=0.4, wspace=0.3)
+    """
+    Apply final standardized layout adjustments
+    The 2x2 grid always uses these fixed margins (no tight_layout solve per chart),
+    so subplot titles and labels must fit within them
+    """
+    fig.subplots_adjust(top=0.88, hspace=0.4, wspace=0.3, left=0.07, right=0.97, bottom=0.07)
+
+def reset_save_context():
+    """Start a new batch: the next save gets a fresh timestamp and re-checks the folder"""
+    _SAVE_CTX['timestamp'] = None
+    _SAVE_CTX['dir_checked'] = False
 
 def save_standardized_chart(fig, filename):
     """Save chart with new_standard prefix and standardized settings to desktop/test folder"""
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    chart_filename = f"new_standard_{filename}_{timestamp}.png"
+    # One timestamp per batch, so all charts of a run share it (see reset_save_context)
+    if _SAVE_CTX['timestamp'] is None:
+        _SAVE_CTX['timestamp'] = datetime.now().strftime('%Y%m%d_%H%M%S')
+    chart_filename = f"new_standard_{filename}_{_SAVE_CTX['timestamp']}.png"
 
     # Create test folder on desktop if it doesn't exist
     desktop_path = "output"
     test_folder = os.path.join(desktop_path, "test")
 
-    if not os.path.exists(test_folder):
-        os.makedirs(test_folder)
-        print(f"📁 Created test folder: {test_folder}")
+    if not _SAVE_CTX['dir_checked']:
+        if not os.path.isdir(test_folder):
+            os.makedirs(test_folder, exist_ok=True)
+            print(f"📁 Created test folder: {test_folder}")
+        _SAVE_CTX['dir_checked'] = True
 
     # Save to desktop/test folder
     full_path = os.path.join(test_folder, chart_filename)
 
-    plt.savefig(full_path, dpi=160, bbox_inches='tight')
+    fig.savefig(full_path, dpi=160, bbox_inches='tight')
     print(f"✅ Saved standardized chart to test folder: {chart_filename}")
     print(f"📁 Full path: {full_path}")
 
@@ -259,18 +468,12 @@ def create_standardized_filename(station, period, analysis_type):
     """Create standardized filename with new_standard prefix"""
     # Clean up the inputs for filename
     station_clean = station.replace(" ", "_")
-    period_clean = period.replace(" ", "_").replace("-", "_")
+    period_clean = period.translate(FILENAME_TRANS)
     analysis_clean = analysis_type.replace(" ", "_")
 
     base_filename = f"{station_clean}_{period_clean}_{analysis_clean}"
     return base_filename
 
-# Import pandas for data handling
-try:
-    import pandas as pd
-except ImportError:
-    print("⚠️ pandas not available - some functions may not work")
-
 def main():
     """Example usage of standardized layout enforcer"""
     print("🎯 STANDARDIZED LAYOUT ENFORCER")
@@ -28,6 +28,9 @@ REPORT_CONFIG = {
     'marker_size': 4
 }
 
+# Filename cleanup: spaces and hyphens -> underscores in one pass
+FILENAME_TRANS = str.maketrans({' ': '_', '-': '_'})
+
 def create_standardized_4panel_chart(station_name, period_name, year_range):
     """
     Create standardized 4-panel chart layout for foF2 analysis
@@ -60,45 +63,56 @@ def create_standardized_4panel_chart(station_name, period_name, year_range):
 
 def format_daily_progression_subplot(ax, title="Daily Average foF2 Progression"):
     """Format the daily progression subplot (top-left)"""
-    ax.set_title(title, fontsize=REPORT_CONFIG['subtitle_fontsize'], fontweight='bold')
-    ax.set_xlabel('Day of Period', fontsize=REPORT_CONFIG['label_fontsize'])
-    ax.set_ylabel('Daily Average foF2 (MHz)', fontsize=REPORT_CONFIG['label_fontsize'])
-    ax.legend(loc='upper right', fontsize=REPORT_CONFIG['legend_fontsize'])
-    ax.grid(True, alpha=REPORT_CONFIG['grid_alpha'])
+    subtitle_fs = REPORT_CONFIG['subtitle_fontsize']
+    label_fs = REPORT_CONFIG['label_fontsize']
+    legend_fs = REPORT_CONFIG['legend_fontsize']
+    grid_alpha = REPORT_CONFIG['grid_alpha']
+    ax.set_title(title, fontsize=subtitle_fs, fontweight='bold')
+    ax.set_xlabel('Day of Period', fontsize=label_fs)
+    ax.set_ylabel('Daily Average foF2 (MHz)', fontsize=label_fs)
+    ax.legend(loc='upper right', fontsize=legend_fs)
+    ax.grid(True, alpha=grid_alpha)
 
 def format_hourly_patterns_subplot(ax, title="Hourly Patterns (24h Average)"):
     """Format the hourly patterns subplot (top-right)"""
     # Add day/night shading
-    ax.axvspan(6, 18, alpha=0.15, color='yellow', label='Daylight')
-    ax.axvspan(18, 24, alpha=0.15, color='gray', label='Night')
-    ax.axvspan(0, 6, alpha=0.15, color='gray')
+    ax.axvspan(6, 18, alpha=0.15, color='yellow', label='Daylight', rasterized=True)
+    ax.axvspan(18, 24, alpha=0.15, color='gray', label='Night', rasterized=True)
+    ax.axvspan(0, 6, alpha=0.15, color='gray', rasterized=True)
     
-    ax.set_title(title, fontsize=REPORT_CONFIG['subtitle_fontsize'], fontweight='bold')
-    ax.set_xlabel('Hour of Day (UTC)', fontsize=REPORT_CONFIG['label_fontsize'])
-    ax.set_ylabel('Average foF2 (MHz)', fontsize=REPORT_CONFIG['label_fontsize'])
-    ax.legend(loc='upper right', fontsize=REPORT_CONFIG['legend_fontsize'])
-    ax.grid(True, alpha=REPORT_CONFIG['grid_alpha'])
+    subtitle_fs = REPORT_CONFIG['subtitle_fontsize']
+    label_fs = REPORT_CONFIG['label_fontsize']
+    legend_fs = REPORT_CONFIG['legend_fontsize']
+    grid_alpha = REPORT_CONFIG['grid_alpha']
+    ax.set_title(title, fontsize=subtitle_fs, fontweight='bold')
+    ax.set_xlabel('Hour of Day (UTC)', fontsize=label_fs)
+    ax.set_ylabel('Average foF2 (MHz)', fontsize=label_fs)
+    ax.legend(loc='upper right', fontsize=legend_fs)
+    ax.grid(True, alpha=grid_alpha)
     ax.set_xlim(0, 23)
     ax.set_xticks(range(0, 24, 6))
 
 def format_statistical_distribution_subplot(ax, title="foF2 Distribution by Year"):
     """Format the statistical distribution subplot (bottom-left)"""
-    ax.set_title(title, fontsize=REPORT_CONFIG['subtitle_fontsize'], fontweight='bold')
-    ax.set_xlabel('Year', fontsize=REPORT_CONFIG['label_fontsize'])
-    ax.set_ylabel('foF2 (MHz)', fontsize=REPORT_CONFIG['label_fontsize'])
-    ax.grid(True, alpha=REPORT_CONFIG['grid_alpha'])
+    subtitle_fs = REPORT_CONFIG['subtitle_fontsize']
+    label_fs = REPORT_CONFIG['label_fontsize']
+    grid_alpha = REPORT_CONFIG['grid_alpha']
+    ax.set_title(title, fontsize=subtitle_fs, fontweight='bold')
+    ax.set_xlabel('Year', fontsize=label_fs)
+    ax.set_ylabel('foF2 (MHz)', fontsize=label_fs)
+    ax.grid(True, alpha=grid_alpha)
 
 def format_nvis_frequency_subplot(ax, avg_fof2, std_fof2, title="foF2 vs NVIS Frequency Bands"):
     """Format the NVIS frequency bands subplot (bottom-right)"""
     
     # Plot foF2 range
     ax.axhspan(avg_fof2 - std_fof2, avg_fof2 + std_fof2,
-               alpha=0.3, color='blue', label=f'foF2: {avg_fof2:.1f}±{std_fof2:.1f} MHz')
+               alpha=0.3, color='blue', label=f'foF2: {avg_fof2:.1f}±{std_fof2:.1f} MHz', rasterized=True)
     ax.axhline(y=avg_fof2, color='blue', linewidth=2)
     
     # Add NVIS frequency bands
-    ax.axhspan(2, 8, alpha=0.2, color='lightgreen', label='Night NVIS (2-8 MHz)')
-    ax.axhspan(8, 15, alpha=0.2, color='lightblue', label='Day NVIS (8-15 MHz)')
+    ax.axhspan(2, 8, alpha=0.2, color='lightgreen', label='Night NVIS (2-8 MHz)', rasterized=True)
+    ax.axhspan(8, 15, alpha=0.2, color='lightblue', label='Day NVIS (8-15 MHz)', rasterized=True)
     
     # Add DGFC frequencies
     ax.axhline(y=7.078, color='red', linewidth=2, linestyle='--', label='DGFC 7.078 MHz')
@@ -109,20 +123,26 @@ def format_nvis_frequency_subplot(ax, avg_fof2, std_fof2, title="foF2 vs NVIS Fr
     ax.axhline(y=muf, color='purple', linewidth=2, linestyle=':',
                label=f'MUF: {muf:.1f} MHz')
     
-    ax.set_title(title, fontsize=REPORT_CONFIG['subtitle_fontsize'], fontweight='bold')
-    ax.set_ylabel('Frequency (MHz)', fontsize=REPORT_CONFIG['label_fontsize'])
-    ax.set_xlabel('NVIS Frequency Bands', fontsize=REPORT_CONFIG['label_fontsize'])
-    ax.legend(loc='upper right', fontsize=REPORT_CONFIG['legend_fontsize'])
-    ax.grid(True, alpha=REPORT_CONFIG['grid_alpha'])
+    subtitle_fs = REPORT_CONFIG['subtitle_fontsize']
+    label_fs = REPORT_CONFIG['label_fontsize']
+    legend_fs = REPORT_CONFIG['legend_fontsize']
+    grid_alpha = REPORT_CONFIG['grid_alpha']
+    ax.set_title(title, fontsize=subtitle_fs, fontweight='bold')
+    ax.set_ylabel('Frequency (MHz)', fontsize=label_fs)
+    ax.set_xlabel('NVIS Frequency Bands', fontsize=label_fs)
+    ax.legend(loc='upper right', fontsize=legend_fs)
+    ax.grid(True, alpha=grid_alpha)
     ax.set_ylim(0, max(25, muf + 5))
     
     # Remove x-axis ticks for frequency bands plot
     ax.set_xticks([])
 
 def apply_standardized_layout(fig):
-    """Apply standardized layout settings"""
-    plt.tight_layout()
-    plt.subplots_adjust(top=0.90, hspace=0.3, wspace=0.3)
+    """
+    Apply standardized layout settings
+    Fixed margins instead of a tight_layout solve; subplot titles must fit within them
+    """
+    fig.subplots_adjust(top=0.90, hspace=0.3, wspace=0.3, left=0.07, right=0.97, bottom=0.07)
 
 def save_standardized_chart(fig, filename, output_dir="/Users/samanthabutterworth/PycharmProjects/pythonProject3/"):
     """Save chart with standardized settings"""
@@ -138,8 +158,8 @@ def get_standardized_colors():
 def create_standardized_filename(station, period, analysis_type, timestamp):
     """Create standardized filename format"""
     # Clean up station and period names
-    station_clean = station.replace(' ', '_').replace('-', '_')
-    period_clean = period.replace(' ', '_').replace('-', '_')
+    station_clean = station.translate(FILENAME_TRANS)
+    period_clean = period.translate(FILENAME_TRANS)
     
     return f"foF2_Analysis_{station_clean}_{period_clean}_{analysis_type}_{timestamp}"
 
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared Data Helpers for the Chart Generators
+============================================
+
+Workbook sheet loading and header handling, the Parquet read cache and small
+numeric helpers used by several generators (imported the way the fig14/fig15
+shims import nvis_generator).
+
+Author: Research Team
+License: MIT
+"""
+
+import pandas as pd
+import numpy as np
+from functools import lru_cache, wraps
+import hashlib
+import os
+import types
+
+# Optional: Parquet cache of parsed workbooks (much faster than re-reading them)
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+def _code_bytes(obj):
+    """Stable bytes for a function (bytecode, names and constants, recursively) or any other value (repr)"""
+    code = obj if isinstance(obj, types.CodeType) else getattr(obj, '__code__', None)
+    if code is None:
+        if isinstance(obj, frozenset):  # set literals: repr order depends on string hashing
+            return repr(sorted(map(repr, obj))).encode()
+        return repr(obj).encode()
+    parts = [code.co_code, repr(code.co_names).encode()]
+    parts += [_code_bytes(const) for const in code.co_consts]
+    return b'|'.join(parts)
+
+def code_fingerprint(*objs):
+    """
+    Short hash of the given reader functions and read parameters; it changes whenever
+    the code or a parameter changes, so cached results of older readers are not reused
+    """
+    digest = hashlib.sha1()
+    for obj in objs:
+        digest.update(_code_bytes(obj))
+        digest.update(b'\0')
+    return digest.hexdigest()[:12]
+
+def cache_df(cache_dir, *depends):
+    """
+    Cache a DataFrame reader func(path, sheet_name) as Parquet under cache_dir, keyed on the
+    path, its mtime, the sheet (or any second argument with a stable repr, e.g. a frozen
+    config) and a fingerprint of func plus the helpers/parameters it depends on, so an
+    edited workbook or reader is re-read (no-op without pyarrow)
+    """
+    def decorator(func):
+        fingerprint = code_fingerprint(func, *depends)
+
+        @wraps(func)
+        def wrapper(path, sheet_name=0):
+            if pyarrow is None:
+                return func(path, sheet_name)
+            key = f"{func.__name__}|{os.path.abspath(path)}|{os.path.getmtime(path)}|{sheet_name}|{fingerprint}"
+            cache_path = os.path.join(cache_dir, hashlib.sha1(key.encode()).hexdigest()[:16] + '.parquet')
+            if os.path.exists(cache_path):
+                df = pd.read_parquet(cache_path, engine='pyarrow')
+                # Parquet stores column names as strings; restore integer labels (years)
+                df.columns = [int(col) if col.isdigit() else col for col in df.columns]
+                return df
+
+            df = func(path, sheet_name)
+            if df is None:  # nothing parsed (e.g. no header row): nothing to cache
+                return df
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                df.rename(columns=str).to_parquet(cache_path, engine='pyarrow', compression='zstd')
+            except Exception as e:
+                print(f"⚠️ Could not cache {cache_path}: {e}")
+            return df
+        return wrapper
+    return decorator
+
+def header_labels(row):
+    """Column labels for a raw header row, named the way pd.read_excel(header=...) names them"""
+    labels = []
+    seen = {}
+    for i, value in enumerate(row):
+        if pd.isna(value):
+            label = f'Unnamed: {i}'
+        elif isinstance(value, float) and value.is_integer():
+            label = int(value)
+        else:
+            label = value
+        if label in seen:
+            seen[label] += 1
+            label = f'{label}.{seen[label]}'
+        else:
+            seen[label] = 0
+        labels.append(label)
+    return labels
+
+def linfit(x, y):
+    """Least-squares slope and intercept of a straight line through (x, y), in closed form"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    dx = x - x.mean()
+    slope = (dx * (y - y.mean())).sum() / (dx * dx).sum()
+    return slope, y.mean() - slope * x.mean()
+
+def combine_date_time(date, time):
+    """
+    DateTime from the sheet's DATE and TIME columns, kept as typed arrays where possible:
+    datetime or Excel-serial dates plus time-of-day values (datetime.time, timedelta or
+    day fractions); anything else falls back to parsing the joined strings
+    """
+    if pd.api.types.is_datetime64_any_dtype(date):
+        day = date.dt.normalize()
+    elif pd.api.types.is_numeric_dtype(date):
+        day = pd.to_datetime(date, unit='D', origin='1899-12-30')
+    else:
+        day = None
+    
+    if day is not None:
+        if pd.api.types.is_timedelta64_dtype(time):
+            return day + time
+        if pd.api.types.is_numeric_dtype(time):
+            return day + pd.to_timedelta(time * 24, unit='h')
+        if pd.api.types.infer_dtype(time, skipna=True) == 'time':  # datetime.time cells
+            return day + pd.to_timedelta(time.astype(str), errors='coerce')
+    
+    return pd.to_datetime(date.astype(str) + ' ' + time.astype(str), errors='coerce')
+
+def find_year_columns(df):
+    """Identify year columns (2017-2023), whether labelled as ints or strings"""
+    cols = pd.Index(df.columns)
+    mask = cols.astype(str).str.fullmatch(r'20(1[7-9]|2[0-3])')
+    return cols[mask].astype(int).tolist()
+
+@lru_cache(maxsize=4)
+def load_sheet(path, sheet_name):
+    """Read and header-resolve one workbook sheet once per run; returns (df, year_columns)"""
+    df_raw = pd.read_excel(path, sheet_name=sheet_name, header=None)
+    
+    # Find header row: the first row with both a DATE and a TIME cell
+    values = df_raw.to_numpy()
+    mask = (values == 'DATE').any(axis=1) & (values == 'TIME').any(axis=1)
+    if not mask.any():
+        raise Exception("Header row not found")
+    header_row = int(np.argmax(mask))
+    
+    # Read with proper header
+    df = pd.read_excel(path, sheet_name=sheet_name, header=header_row)
+    df = df.dropna(how='all')
+    
+    # Create DateTime column
+    if 'DATE' in df.columns and 'TIME' in df.columns:
+        df['DateTime'] = combine_date_time(df['DATE'], df['TIME'])
+        df = df.dropna(subset=['DateTime'])
+    
+    return df, find_year_columns(df)
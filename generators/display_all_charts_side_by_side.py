@@ -24,85 +24,226 @@ import matplotlib.pyplot as plt
 from matplotlib.gridspec import GridSpec
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from data_utils import cache_df, header_labels
+
+# Optional: Numba JIT for the hourly aggregation on large (multi-year, minute-resolution) inputs
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
 
 # Configuration
 NVIS_DATA_FILE = "data/NVIS_data.xlsx"
+SHEET_CACHE_DIR = ".cache"
+NUMBA_MIN_SAMPLES = 100_000    # below this the NumPy path is as fast as the JIT kernel
 
 # Import calculation functions from analysis scripts
 def calculate_fof2_from_signal_darwin(signal_db, frequency_mhz=7.0):
-    """Estimate foF2 from signal strength for Darwin"""
+    """Estimate foF2 from signal strength for Darwin (returns a new float32 array)"""
     baseline_fof2 = 9.0
-    signal_factor = signal_db / 12.0
-    estimated_fof2 = baseline_fof2 + signal_factor
-    return np.clip(estimated_fof2, 3.0, 15.0)
+    # One fresh float32 buffer, updated in place: plots only need ~0.1 MHz precision
+    estimated_fof2 = np.divide(np.asarray(signal_db, dtype=np.float32), 12.0)
+    np.add(estimated_fof2, baseline_fof2, out=estimated_fof2)
+    return np.clip(estimated_fof2, 3.0, 15.0, out=estimated_fof2)
 
 def calculate_fof2_from_signal_guam(signal_db, frequency_mhz=7.0):
-    """Estimate foF2 from signal strength for Guam"""
+    """Estimate foF2 from signal strength for Guam (returns a new float32 array)"""
     baseline_fof2 = 10.5
-    signal_factor = signal_db / 10.0
-    estimated_fof2 = baseline_fof2 + signal_factor
-    return np.clip(estimated_fof2, 4.0, 18.0)
+    estimated_fof2 = np.divide(np.asarray(signal_db, dtype=np.float32), 10.0)
+    np.add(estimated_fof2, baseline_fof2, out=estimated_fof2)
+    return np.clip(estimated_fof2, 4.0, 18.0, out=estimated_fof2)
+
+@cache_df(SHEET_CACHE_DIR, header_labels)
+def parse_sheet(path, sheet_name):
+    """Read one sheet from the workbook and parse DateTime (Parquet cache across runs); None if no header row"""
+    df_raw = pd.read_excel(path, sheet_name=sheet_name, header=None)
+    
+    # Find header row
+    is_header = df_raw.eq('DATE').any(axis=1) & df_raw.eq('TIME').any(axis=1)
+    if not is_header.any():
+        return None
+    header_row = is_header.idxmax()
+    
+    df = df_raw.iloc[header_row + 1:].reset_index(drop=True)
+    df.columns = header_labels(df_raw.iloc[header_row])
+    df = df.infer_objects().dropna(how='all')
+    
+    if 'DATE' in df.columns and 'TIME' in df.columns:
+        df['DateTime'] = pd.to_datetime(df['DATE'].astype(str) + ' ' + df['TIME'].astype(str), 
+                                      errors='coerce')
+        df = df.dropna(subset=['DateTime'])
+    return df
+
+def find_year_columns(df):
+    """Identify year columns (2017-2023)"""
+    year_columns = []
+    for col in df.columns:
+        if col not in ['DATE', 'TIME', 'DateTime'] and pd.api.types.is_numeric_dtype(df[col]):
+            if isinstance(col, (int, float)) and 2017 <= col <= 2023:
+                year_columns.append(col)
+    return year_columns
+
+_SHEETS = {}   # sheet name -> (df, year_columns) or None, filled once per run
+
+def _read_sheet(sheet_name):
+    """Parse one sheet; returns (df, year_columns) or None"""
+    df = parse_sheet(NVIS_DATA_FILE, sheet_name)
+    return None if df is None else (df, find_year_columns(df))
+
+def _load_sheet(sheet_name):
+    """Parse one sheet once per run"""
+    if sheet_name not in _SHEETS:
+        _SHEETS[sheet_name] = _read_sheet(sheet_name)
+    return _SHEETS[sheet_name]
+
+def preload_sheets(sheet_names):
+    """
+    Parse the sheets not yet loaded in parallel worker processes; if the pool itself fails,
+    the sheets it did not finish are left to _load_sheet, which parses them serially
+    """
+    pending = [name for name in dict.fromkeys(sheet_names) if name not in _SHEETS]
+    workers = min(len(pending), os.cpu_count() or 1)
+    if workers < 2 or not os.path.exists(NVIS_DATA_FILE):
+        return
+    
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            futures = {ex.submit(_read_sheet, name): name for name in pending}
+            for future in as_completed(futures):
+                _SHEETS[futures[future]] = future.result()
+    except (BrokenProcessPool, OSError) as e:
+        print(f"⚠️ Parallel load failed, loading the remaining sheets serially: {e}")
+
+def filter_april_days(df, first_day=1, last_day=30):
+    """Keep April rows between first_day and last_day inclusive"""
+    day = df['DateTime'].dt.day
+    return df[(df['DateTime'].dt.month == 4) & (day >= first_day) & (day <= last_day)]
 
 def load_data(sheet_name, filter_func=None):
-    """Generic data loading function"""
+    """Generic data loading function (each sheet is read and parsed only once)"""
     if not os.path.exists(NVIS_DATA_FILE):
         return None
     
     try:
-        df_raw = pd.read_excel(NVIS_DATA_FILE, sheet_name=sheet_name, header=None)
-        
-        # Find header row
-        header_row = None
-        for idx, row in df_raw.iterrows():
-            if 'DATE' in str(row.values) and 'TIME' in str(row.values):
-                header_row = idx
-                break
-        
-        if header_row is None:
+        loaded = _load_sheet(sheet_name)
+        if loaded is None:
             return None
+        df, year_columns = loaded
         
-        df = pd.read_excel(NVIS_DATA_FILE, sheet_name=sheet_name, header=header_row, skiprows=0)
-        df = df.dropna(how='all')
-        
-        if 'DATE' in df.columns and 'TIME' in df.columns:
-            df['DateTime'] = pd.to_datetime(df['DATE'].astype(str) + ' ' + df['TIME'].astype(str), 
-                                          errors='coerce')
-            df = df.dropna(subset=['DateTime'])
-        
-        # Apply filter if provided
-        if filter_func:
-            df = filter_func(df)
+        # Filters get their own copy so the cached sheet is never modified
+        df = filter_func(df.copy()) if filter_func else df.copy()
         
-        # Identify year columns (2017-2023)
-        year_columns = []
-        for col in df.columns:
-            if col not in ['DATE', 'TIME', 'DateTime'] and pd.api.types.is_numeric_dtype(df[col]):
-                if isinstance(col, (int, float)) and 2017 <= col <= 2023:
-                    year_columns.append(col)
+        # All years stacked once as a (rows, years) float32 block, with its valid-sample mask
+        Y = df[year_columns].to_numpy(dtype=np.float32)
         
-        return {'data': df, 'year_columns': year_columns}
+        # Time-of-day fields are shared by every year and panel, so extract them once
+        timestamps = df['DateTime'].dt
+        return {'data': df, 'year_columns': year_columns, 'Y': Y, 'mask': ~np.isnan(Y),
+                'hour': timestamps.hour.to_numpy(np.int8),
+                'day': timestamps.day.to_numpy(np.int8),
+                'hour_dec': (timestamps.hour + timestamps.minute / 60.0).to_numpy(np.float32)}
     except Exception as e:
         print(f"Error loading {sheet_name} data: {e}")
         return None
 
+def hourly_fof2_by_year(data_dict, calc_func):
+    """
+    Mean foF2 per UTC hour for all years in one sorted pass
+    Returns (hours, means) with means shaped (hours, years); NaN where a year has no data
+    """
+    hours = data_dict['hour']
+    values = calc_func(data_dict['Y'])
+    valid = data_dict['mask']
+    
+    if njit is not None and values.size >= NUMBA_MIN_SAMPLES:
+        present_hours = np.flatnonzero(np.bincount(hours, minlength=24))
+        return present_hours, _hourly_mean(hours, values, valid)[present_hours]
+    
+    # Sort rows by hour once, then sum each hour's block for every year column together
+    order = np.argsort(hours, kind='stable')
+    present_hours, starts = np.unique(hours[order], return_index=True)
+    sums = np.add.reduceat(np.where(valid, values, 0.0)[order], starts, axis=0)
+    counts = np.add.reduceat(valid[order].astype(np.int64), starts, axis=0)
+    with np.errstate(invalid='ignore'):
+        return present_hours, sums / counts
+
+def group_mean(keys, values):
+    """Mean of values per small integer key (e.g. day of month), for the keys present"""
+    counts = np.bincount(keys)
+    sums = np.bincount(keys, weights=values)
+    present = np.flatnonzero(counts)
+    return present, sums[present] / counts[present]
+
+def compute_panel_data(data_dict, calc_func):
+    """
+    Everything the four panel types plot, computed once per dataset and cached in data_dict
+    so the 4-panel chart and the single panels share it
+    """
+    cache = data_dict.setdefault('panel_data', {})
+    if calc_func in cache:
+        return cache[calc_func]
+    
+    mask = data_dict['mask']
+    per_year = [calc_func(data_dict['Y'][mask[:, i], i]) for i in range(mask.shape[1])]
+    hours, hourly_means = hourly_fof2_by_year(data_dict, calc_func)
+    
+    hour_decimal = data_dict['hour_dec']
+    progression_24h = []
+    for i, values in enumerate(per_year):
+        year_hours = hour_decimal[mask[:, i]]
+        order = np.argsort(year_hours)
+        progression_24h.append((year_hours[order], values[order]))
+    
+    all_fof2_combined = np.concatenate(per_year)
+    cache[calc_func] = {
+        'hours': hours,
+        'hourly_means': hourly_means,
+        'per_year': per_year,
+        'daily_means': [group_mean(data_dict['day'][mask[:, i]], values) for i, values in enumerate(per_year)],
+        'progression_24h': progression_24h,
+        'mean': np.mean(all_fof2_combined),
+        'std': np.std(all_fof2_combined),
+    }
+    return cache[calc_func]
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _hourly_mean(hours, values, valid):
+        """(24, years) mean of values per hour; one thread per year so sums never race, NaN if empty"""
+        n_rows, n_years = values.shape
+        means = np.full((24, n_years), np.nan)
+        for j in prange(n_years):
+            sums = np.zeros(24)
+            counts = np.zeros(24, dtype=np.int64)
+            for i in range(n_rows):
+                if valid[i, j]:
+                    sums[hours[i]] += values[i, j]
+                    counts[hours[i]] += 1
+            for h in range(24):
+                if counts[h] > 0:
+                    means[h, j] = sums[h] / counts[h]
+        return means
+
 def create_4panel_chart(axes_list, data_dict, station_name, period_name, calc_func, colors):
     """Create a 4-panel chart in the given axes list [ax1, ax2, ax3, ax4]"""
     
-    df = data_dict['data']
     year_columns = data_dict['year_columns']
+    panel = compute_panel_data(data_dict, calc_func)
     
     # Panel 1: Hourly Patterns (top-left)
     ax1 = axes_list[0]
+    hours, hourly_means = panel['hours'], panel['hourly_means']
     for i, year in enumerate(year_columns):
-        df_year = df.dropna(subset=[year])
-        df_year['Hour'] = df_year['DateTime'].dt.hour
-        df_year['foF2_estimated'] = calc_func(df_year[year])
-        hourly_fof2 = df_year.groupby('Hour')['foF2_estimated'].mean()
+        has_data = ~np.isnan(hourly_means[:, i])
         
-        ax1.plot(hourly_fof2.index, hourly_fof2.values,
+        ax1.plot(hours[has_data], hourly_means[has_data, i],
                 color=colors[i], marker='o', linewidth=1.5, markersize=3,
                 label=f'{int(year)}')
     
@@ -120,14 +261,8 @@ def create_4panel_chart(axes_list, data_dict, station_name, period_name, calc_fu
     
     # Panel 2: Statistical Distribution (top-right)
     ax2 = axes_list[1]
-    fof2_data = []
-    year_labels = []
-    
-    for year in year_columns:
-        df_year = df.dropna(subset=[year])
-        fof2_values = calc_func(df_year[year])
-        fof2_data.append(fof2_values)
-        year_labels.append(f'{int(year)}')
+    fof2_data = panel['per_year']
+    year_labels = [f'{int(year)}' for year in year_columns]
     
     bp = ax2.boxplot(fof2_data, tick_labels=year_labels, patch_artist=True)
     for patch, color in zip(bp['boxes'], colors):
@@ -147,12 +282,9 @@ def create_4panel_chart(axes_list, data_dict, station_name, period_name, calc_fu
     if 'Day' in str(period_name) or '15-28' in str(period_name):
         # Daily progression
         for i, year in enumerate(year_columns):
-            df_year = df.dropna(subset=[year])
-            df_year['Day'] = df_year['DateTime'].dt.day
-            df_year['foF2_estimated'] = calc_func(df_year[year])
-            daily_fof2 = df_year.groupby('Day')['foF2_estimated'].mean()
+            day_keys, daily_fof2 = panel['daily_means'][i]
             
-            ax3.plot(daily_fof2.index, daily_fof2.values,
+            ax3.plot(day_keys, daily_fof2,
                     color=colors[i], marker='o', linewidth=1.5, markersize=3,
                     label=f'{int(year)}')
         
@@ -161,14 +293,9 @@ def create_4panel_chart(axes_list, data_dict, station_name, period_name, calc_fu
     else:
         # For April 15th, show 24-hour progression
         for i, year in enumerate(year_columns):
-            df_year = df.dropna(subset=[year])
-            df_year['Hour'] = df_year['DateTime'].dt.hour
-            df_year['Minute'] = df_year['DateTime'].dt.minute
-            df_year['HourDecimal'] = df_year['Hour'] + df_year['Minute'] / 60.0
-            df_year['foF2_estimated'] = calc_func(df_year[year])
-            df_year = df_year.sort_values('HourDecimal')
+            year_hours, year_fof2 = panel['progression_24h'][i]
             
-            ax3.plot(df_year['HourDecimal'], df_year['foF2_estimated'],
+            ax3.plot(year_hours, year_fof2,
                     color=colors[i], marker='o', linewidth=1.5, markersize=2,
                     label=f'{int(year)}')
         
@@ -188,15 +315,8 @@ def create_4panel_chart(axes_list, data_dict, station_name, period_name, calc_fu
     # Panel 4: NVIS Frequency Bands (bottom-right)
     ax4 = axes_list[3]
     
-    # Calculate overall average foF2
-    all_fof2_combined = []
-    for year in year_columns:
-        df_year = df.dropna(subset=[year])
-        fof2_values = calc_func(df_year[year])
-        all_fof2_combined.extend(fof2_values)
-    
-    avg_fof2_combined = np.mean(all_fof2_combined)
-    std_fof2_combined = np.std(all_fof2_combined)
+    # Overall average foF2
+    avg_fof2_combined, std_fof2_combined = panel['mean'], panel['std']
     
     # Plot foF2 range
     ax4.axhspan(avg_fof2_combined - std_fof2_combined, avg_fof2_combined + std_fof2_combined,
@@ -234,24 +354,22 @@ def create_4panel_chart(axes_list, data_dict, station_name, period_name, calc_fu
 def create_single_panel(ax, data_dict, panel_type, station_name, period_name, calc_func, colors):
     """Create a single panel of a specific type"""
     
-    df = data_dict['data']
     year_columns = data_dict['year_columns']
+    panel = compute_panel_data(data_dict, calc_func)
     
     if panel_type == 'hourly':
         # Hourly Patterns
+        hours, hourly_means = panel['hours'], panel['hourly_means']
         for i, year in enumerate(year_columns):
-            df_year = df.dropna(subset=[year]).copy()
-            df_year['Hour'] = df_year['DateTime'].dt.hour
-            df_year['foF2_estimated'] = calc_func(df_year[year])
-            hourly_fof2 = df_year.groupby('Hour')['foF2_estimated'].mean()
+            has_data = ~np.isnan(hourly_means[:, i])
             
-            ax.plot(hourly_fof2.index, hourly_fof2.values,
+            ax.plot(hours[has_data], hourly_means[has_data, i],
                     color=colors[i], marker='o', linewidth=1.5, markersize=3,
-                    label=f'{int(year)}')
+                    label=f'{int(year)}', rasterized=True)
         
-        ax.axvspan(6, 18, alpha=0.15, color='yellow')
-        ax.axvspan(18, 24, alpha=0.15, color='gray')
-        ax.axvspan(0, 6, alpha=0.15, color='gray')
+        ax.axvspan(6, 18, alpha=0.15, color='yellow', rasterized=True)
+        ax.axvspan(18, 24, alpha=0.15, color='gray', rasterized=True)
+        ax.axvspan(0, 6, alpha=0.15, color='gray', rasterized=True)
         ax.set_title(f'{station_name} - {period_name}\nHourly Patterns (24h)', 
                     fontsize=18, fontweight='bold', pad=10)
         ax.set_xlabel('Hour (UTC)', fontsize=8)
@@ -264,14 +382,8 @@ def create_single_panel(ax, data_dict, panel_type, station_name, period_name, ca
         
     elif panel_type == 'distribution':
         # Statistical Distribution
-        fof2_data = []
-        year_labels = []
-        
-        for year in year_columns:
-            df_year = df.dropna(subset=[year]).copy()
-            fof2_values = calc_func(df_year[year])
-            fof2_data.append(fof2_values)
-            year_labels.append(f'{int(year)}')
+        fof2_data = panel['per_year']
+        year_labels = [f'{int(year)}' for year in year_columns]
         
         bp = ax.boxplot(fof2_data, tick_labels=year_labels, patch_artist=True)
         for patch, color in zip(bp['boxes'], colors):
@@ -290,14 +402,11 @@ def create_single_panel(ax, data_dict, panel_type, station_name, period_name, ca
         if 'Day' in str(period_name) or '15-28' in str(period_name) or 'Full' in str(period_name):
             # Daily progression
             for i, year in enumerate(year_columns):
-                df_year = df.dropna(subset=[year]).copy()
-                df_year['Day'] = df_year['DateTime'].dt.day
-                df_year['foF2_estimated'] = calc_func(df_year[year])
-                daily_fof2 = df_year.groupby('Day')['foF2_estimated'].mean()
+                day_keys, daily_fof2 = panel['daily_means'][i]
                 
-                ax.plot(daily_fof2.index, daily_fof2.values,
+                ax.plot(day_keys, daily_fof2,
                         color=colors[i], marker='o', linewidth=1.5, markersize=3,
-                        label=f'{int(year)}')
+                        label=f'{int(year)}', rasterized=True)
             
             ax.set_xlabel('Day of Period', fontsize=8)
             ax.set_title(f'{station_name} - {period_name}\nDaily Progression', 
@@ -305,20 +414,15 @@ def create_single_panel(ax, data_dict, panel_type, station_name, period_name, ca
         else:
             # For April 15th, show 24-hour progression
             for i, year in enumerate(year_columns):
-                df_year = df.dropna(subset=[year]).copy()
-                df_year['Hour'] = df_year['DateTime'].dt.hour
-                df_year['Minute'] = df_year['DateTime'].dt.minute
-                df_year['HourDecimal'] = df_year['Hour'] + df_year['Minute'] / 60.0
-                df_year['foF2_estimated'] = calc_func(df_year[year])
-                df_year = df_year.sort_values('HourDecimal')
+                year_hours, year_fof2 = panel['progression_24h'][i]
                 
-                ax.plot(df_year['HourDecimal'], df_year['foF2_estimated'],
+                ax.plot(year_hours, year_fof2,
                         color=colors[i], marker='o', linewidth=1.5, markersize=2,
-                        label=f'{int(year)}')
+                        label=f'{int(year)}', rasterized=True)
             
-            ax.axvspan(6, 18, alpha=0.15, color='yellow')
-            ax.axvspan(18, 24, alpha=0.15, color='gray')
-            ax.axvspan(0, 6, alpha=0.15, color='gray')
+            ax.axvspan(6, 18, alpha=0.15, color='yellow', rasterized=True)
+            ax.axvspan(18, 24, alpha=0.15, color='gray', rasterized=True)
+            ax.axvspan(0, 6, alpha=0.15, color='gray', rasterized=True)
             ax.set_xlabel('Hour', fontsize=8)
             ax.set_title(f'{station_name} - {period_name}\n24h Progression', 
                         fontsize=18, fontweight='bold', pad=10)
@@ -332,23 +436,16 @@ def create_single_panel(ax, data_dict, panel_type, station_name, period_name, ca
         
     elif panel_type == 'nvis':
         # NVIS Frequency Bands
-        all_fof2_combined = []
-        for year in year_columns:
-            df_year = df.dropna(subset=[year]).copy()
-            fof2_values = calc_func(df_year[year])
-            all_fof2_combined.extend(fof2_values)
-        
-        avg_fof2_combined = np.mean(all_fof2_combined)
-        std_fof2_combined = np.std(all_fof2_combined)
+        avg_fof2_combined, std_fof2_combined = panel['mean'], panel['std']
         
         # Plot foF2 range
         ax.axhspan(avg_fof2_combined - std_fof2_combined, avg_fof2_combined + std_fof2_combined,
-                    alpha=0.3, color='blue', label=f'foF2: {avg_fof2_combined:.1f}±{std_fof2_combined:.1f}')
+                    alpha=0.3, color='blue', label=f'foF2: {avg_fof2_combined:.1f}±{std_fof2_combined:.1f}', rasterized=True)
         ax.axhline(y=avg_fof2_combined, color='blue', linewidth=2)
         
         # Add NVIS frequency bands
-        ax.axhspan(2, 8, alpha=0.2, color='lightgreen', label='Night NVIS')
-        ax.axhspan(8, 15, alpha=0.2, color='lightblue', label='Day NVIS')
+        ax.axhspan(2, 8, alpha=0.2, color='lightgreen', label='Night NVIS', rasterized=True)
+        ax.axhspan(8, 15, alpha=0.2, color='lightblue', label='Day NVIS', rasterized=True)
         
         # Add DGFC frequencies
         ax.axhline(y=7.078, color='red', linewidth=2, linestyle='--', label='7.078 MHz')
@@ -374,19 +471,17 @@ def create_all_charts_side_by_side():
     
     print("📊 Loading all data...")
     
-    # Load all datasets
-    datasets = [
-        load_data('Darwin', lambda df: df[(df['DateTime'].dt.month == 4) & (df['DateTime'].dt.day == 15)]),
-        load_data('Darwin', lambda df: df[(df['DateTime'].dt.month == 4) & 
-                                          (df['DateTime'].dt.day >= 15) & 
-                                          (df['DateTime'].dt.day <= 28)]),
-        load_data('Darwin', lambda df: df[df['DateTime'].dt.month == 4]),
-        load_data('Guam', lambda df: df[(df['DateTime'].dt.month == 4) & (df['DateTime'].dt.day == 15)]),
-        load_data('Guam', lambda df: df[(df['DateTime'].dt.month == 4) & 
-                                        (df['DateTime'].dt.day >= 15) & 
-                                        (df['DateTime'].dt.day <= 28)]),
-        load_data('Guam', lambda df: df[df['DateTime'].dt.month == 4])
+    # Load all datasets (the two sheets are parsed in parallel, then filtered per period)
+    dataset_specs = [
+        ('Darwin', partial(filter_april_days, first_day=15, last_day=15)),
+        ('Darwin', partial(filter_april_days, first_day=15, last_day=28)),
+        ('Darwin', filter_april_days),
+        ('Guam', partial(filter_april_days, first_day=15, last_day=15)),
+        ('Guam', partial(filter_april_days, first_day=15, last_day=28)),
+        ('Guam', filter_april_days)
     ]
+    preload_sheets(sheet for sheet, _ in dataset_specs)
+    datasets = [load_data(sheet, filter_func) for sheet, filter_func in dataset_specs]
     
     dataset_info = [
         ('Darwin', 'April 15th', calculate_fof2_from_signal_darwin),
@@ -448,7 +543,7 @@ def create_all_charts_side_by_side():
     
     # Save the figure as PNG
     output_file = "All_foF2_Charts_Stacked_Columns_2017-2023.png"
-    plt.savefig(output_file, dpi=160, bbox_inches='tight', format='png')
+    plt.savefig(output_file, dpi=120, format='png')
     print(f"✅ Saved as PNG: {output_file}")
     
     plt.show()
@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import re
 from pathlib import Path
 from datetime import datetime, date, timedelta, timezone
-from math import sin, cos, asin, acos, atan2, pi, floor
+from math import pi, floor
 from zoneinfo import ZoneInfo
 
 import numpy as np
@@ -63,6 +64,14 @@ USE_BEST_QUALITY_ONLY = True  # Filter to best quality periods only
 # ===============================
 
 
+# Clock-time layouts seen in the field logs, e.g. "02:16", "2:16:30 PM"
+TIME_PATTERN = re.compile(r"\d{1,2}:\d{2}(:\d{2})?( [AP]M)?")
+
+# Plot title -> filesystem-safe PNG name ("±" needs two characters, so it is
+# replaced before the single-character table is applied)
+FILENAME_TRANS = str.maketrans({":": "-", "/": "-", " ": "_", "(": "", ")": "", ",": ""})
+
+
 # ---------- Solar utils (NOAA-ish) ----------
 def deg2rad(d): return d * pi / 180.0
 def rad2deg(r): return r * 180.0 / pi
@@ -76,30 +85,30 @@ def julian_day(d: date) -> float:
 
 def jd_to_jcent(jd): return (jd - 2451545.0) / 36525.0
 
+# solar_coords, hour_angle and solar_transit_jd take scalars or NumPy arrays (one value per day)
 def solar_coords(jc):
     M = deg2rad((357.52911 + jc*(35999.05029 - 0.0001537*jc)) % 360.0)
     L0 = (280.46646 + jc*(36000.76983 + jc*0.0003032)) % 360.0
-    C = (deg2rad(1.914602 - jc*(0.004817 + 0.000014*jc))*sin(M)
-         + deg2rad(0.019993 - 0.000101*jc)*sin(2*M)
-         + deg2rad(0.000289)*sin(3*M))
+    C = (deg2rad(1.914602 - jc*(0.004817 + 0.000014*jc))*np.sin(M)
+         + deg2rad(0.019993 - 0.000101*jc)*np.sin(2*M)
+         + deg2rad(0.000289)*np.sin(3*M))
     lam = deg2rad((L0 + rad2deg(C)) % 360.0)
     eps = deg2rad(23.439291 - jc*(0.0130042 + jc*(1.64e-7 - 5.04e-7*jc)))
-    delta = asin(sin(eps)*sin(lam))
-    alpha = atan2(cos(eps)*sin(lam), cos(lam))
+    delta = np.arcsin(np.sin(eps)*np.sin(lam))
+    alpha = np.arctan2(np.cos(eps)*np.sin(lam), np.cos(lam))
     return M, lam, delta, alpha, eps
 
 def hour_angle(lat_rad, dec, altitude=-0.833):
     alt = deg2rad(altitude)
-    cosH = (sin(alt) - sin(lat_rad)*sin(dec)) / (cos(lat_rad)*cos(dec))
-    cosH = min(1.0, max(-1.0, cosH))
-    return acos(cosH)
+    cosH = (np.sin(alt) - np.sin(lat_rad)*np.sin(dec)) / (np.cos(lat_rad)*np.cos(dec))
+    return np.arccos(np.clip(cosH, -1.0, 1.0))
 
 def solar_transit_jd(jd, lw):
-    n = round(jd - 2451545.0009 - lw/(2*pi))
+    n = np.round(jd - 2451545.0009 - lw/(2*pi))
     Japprox = 2451545.0009 + lw/(2*pi) + n
     M_ = deg2rad((357.5291 + 0.98560028*(Japprox - 2451545)) % 360.0)
-    lam_ = deg2rad((280.160 + 1.915*sin(M_) + 0.020*sin(2*M_) + 0.0003*sin(3*M_)) % 360.0)
-    return 2451545.0009 + lw/(2*pi) + n + 0.0053*sin(M_) - 0.0069*sin(2*lam_)
+    lam_ = deg2rad((280.160 + 1.915*np.sin(M_) + 0.020*np.sin(2*M_) + 0.0003*np.sin(3*M_)) % 360.0)
+    return 2451545.0009 + lw/(2*pi) + n + 0.0053*np.sin(M_) - 0.0069*np.sin(2*lam_)
 
 def jd_to_utc_datetime(jd):
     J = jd + 0.5
@@ -133,6 +142,20 @@ def sunrise_sunset_local(d: date, lat_deg: float, lon_deg: float, tz: ZoneInfo):
     sr = jd_to_utc_datetime(Jrise).astimezone(tz).replace(tzinfo=None)
     ss = jd_to_utc_datetime(Jset ).astimezone(tz).replace(tzinfo=None)
     return sr, ss
+
+def sunrise_sunset_jd(jd, lat_deg: float, lon_deg: float):
+    """Vectorised sunrise_sunset_local: 0h-UT Julian days -> (Jrise, Jset) arrays."""
+    jd = np.asarray(jd, dtype=np.float64)
+    _, _, dec, _, _ = solar_coords(jd_to_jcent(jd))
+    H = hour_angle(deg2rad(lat_deg), dec, altitude=-0.833)
+    Jtransit = solar_transit_jd(jd, deg2rad(-lon_deg))  # west negative
+    half_day = rad2deg(H)/360.0
+    return Jtransit - half_day, Jtransit + half_day
+
+def jd_to_local_naive(jd, tz: ZoneInfo) -> pd.DatetimeIndex:
+    """Julian days -> naive local timestamps, converted in one vectorised pass."""
+    seconds = np.round((np.asarray(jd, dtype=np.float64) - 2440587.5) * 86400.0)
+    return pd.to_datetime(seconds, unit="s", utc=True).tz_convert(tz).tz_localize(None)
 # -----------------------------------------
 
 
@@ -165,6 +188,17 @@ def read_table_any(p: Path) -> pd.DataFrame:
     return pd.read_excel(p, engine="openpyxl")
 
 
+def sniff_time_format(sample):
+    """Return the strptime format matching a sample time value, or None."""
+    m = TIME_PATTERN.fullmatch(str(sample).strip())
+    if m is None:
+        return None
+    has_seconds, has_meridiem = m.group(1) is not None, m.group(2) is not None
+    if has_meridiem:
+        return "%I:%M:%S %p" if has_seconds else "%I:%M %p"
+    return "%H:%M:%S" if has_seconds else "%H:%M"
+
+
 def ensure_date_column(df: pd.DataFrame) -> pd.DataFrame:
     """Ensure a proper Date column of dtype datetime64[ns] normalized to midnight."""
     if "Date" in df.columns:
@@ -190,14 +224,17 @@ def ensure_date_column(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def compute_sun_table(dates, lat, lon, tz):
-    recs = []
-    for d in sorted({d for d in pd.to_datetime(dates).dt.date if pd.notna(d)}):
-        sr, ss = sunrise_sunset_local(d, lat, lon, tz)
-        recs.append({"Date": pd.Timestamp(d), "Sunrise": sr, "Sunset": ss})
-    sun = pd.DataFrame(recs)
-    if not sun.empty:
-        sun["Date"] = pd.to_datetime(sun["Date"]).dt.normalize()
-    return sun
+    days = pd.DatetimeIndex(pd.to_datetime(dates).dropna().dt.normalize().unique()).sort_values()
+    if days.empty:
+        return pd.DataFrame(columns=["Date", "Sunrise", "Sunset"])
+    # 0h-UT Julian day of each calendar date (Unix epoch is JD 2440587.5)
+    jd = days.values.astype("datetime64[D]").astype(np.int64) + 2440587.5
+    jrise, jset = sunrise_sunset_jd(jd, lat, lon)
+    return pd.DataFrame({
+        "Date": days,
+        "Sunrise": jd_to_local_naive(jrise, tz),
+        "Sunset": jd_to_local_naive(jset, tz),
+    })
 
 
 def filter_to_best_quality_period(df: pd.DataFrame, filename: str) -> pd.DataFrame:
@@ -296,12 +333,15 @@ def optional_plot(in_or_enriched_path: Path, site_name: str, window: int):
     # We need Date + either DateTime or (Date+Time). And SNR_DB.
     if "DateTime" not in df.columns:
         if "Time" in df.columns:
-            # Normalize Time to HH:MM for consistency
+            # Normalize Time to HH:MM for consistency; sniff the format from
+            # the first value so the column is parsed once, not once per format
+            times = df["Time"].dropna()
+            fmt = sniff_time_format(times.iloc[0]) if not times.empty else None
             t_try = None
-            for fmt in ("%H:%M:%S", "%H:%M", "%I:%M:%S %p", "%I:%M %p"):
+            if fmt is not None:
                 tt = pd.to_datetime(df["Time"], format=fmt, errors="coerce")
                 if tt.notna().sum() >= int(0.8 * len(df)):
-                    t_try = tt; break
+                    t_try = tt
             if t_try is None:
                 t_try = pd.to_datetime(df["Time"], errors="coerce")
             df["Time"] = np.where(t_try.notna(), t_try.dt.strftime("%H:%M"), df["Time"].astype(str))
@@ -476,8 +516,7 @@ def optional_plot(in_or_enriched_path: Path, site_name: str, window: int):
     plt.tight_layout()
 
     # Create filename from title (sanitize for filesystem)
-    safe_title = title.replace(":", "-").replace("/", "-").replace("±", "+-").replace(" ", "_")
-    safe_title = safe_title.replace("(", "").replace(")", "").replace(",", "")
+    safe_title = title.replace("±", "+-").translate(FILENAME_TRANS)
 
     # Save to current working directory (Mark_paper_2)
     import os
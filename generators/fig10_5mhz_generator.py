@@ -1,15 +1,40 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import os
+import sys
 import pandas as pd
 import numpy as np
+import matplotlib
+
+# Batch runs (--noshow, or stdout not a terminal) save the figure with Agg instead of opening a window
+NO_SHOW = __name__ == '__main__' and ('--noshow' in sys.argv[1:] or not sys.stdout.isatty())
+if NO_SHOW:
+    matplotlib.use('Agg')
+
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+import matplotlib.patches as mpatches
 from matplotlib.ticker import MaxNLocator
-from math import sin, cos, asin, acos, atan2, pi, floor
+from math import pi, floor
 from datetime import datetime, date, timedelta, timezone
+from functools import lru_cache
 from zoneinfo import ZoneInfo
 
+# Optional: bottleneck's C moving-window mean (NumPy cumsum fallback below)
+try:
+    import bottleneck as bn
+except ImportError:
+    bn = None
+
+# Optional: pyarrow's multithreaded CSV reader (falls back to pd.read_csv)
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+
 # ========= USER SETTINGS =========
 FILE_PATH = 'data/5_GHZ_Standardized_data_preview__first_200_rows_.csv'
 SITE_NAME = 'Danau Girang Field Centre (DGFC) 5 MHz'
@@ -20,46 +45,51 @@ WINDOW_SIZE = 10               # moving average window
 LINE_COLOR = 'black'
 SAVE_ENRICHED_EXCEL = False    # set True to save sunrise/sunset columns alongside your data
 ENRICHED_OUT = 'output/5_GHZ_with_sun_dgfc.xlsx'
+FIGURE_OUT = 'output/fig10_5mhz_dgfc.png'   # written instead of plt.show() when NO_SHOW
 # =================================
 
 # ---- NOAA-style solar utilities ----
 def deg2rad(d): return d * pi / 180.0
 def rad2deg(r): return r * 180.0 / pi
 
-def julian_day(d: date) -> float:
-    y, m, D = d.year, d.month, d.day
+@lru_cache(maxsize=None)
+def _month_base(y: int, m: int) -> float:
+    """Julian day of day 0 of the month; only the day of month varies within a run"""
     if m <= 2:
         y -= 1; m += 12
     A = floor(y/100)
     B = 2 - A + floor(A/4)
-    return floor(365.25*(y + 4716)) + floor(30.6001*(m + 1)) + D + B - 1524.5
+    return floor(365.25*(y + 4716)) + floor(30.6001*(m + 1)) + B - 1524.5
+
+def julian_day(d: date) -> float:
+    return _month_base(d.year, d.month) + d.day
 
 def jd_to_jcent(jd): return (jd - 2451545.0) / 36525.0
 
+# solar_coords, hour_angle and solar_transit_jd take scalars or NumPy arrays (one value per day)
 def solar_coords(jc):
     M = deg2rad((357.52911 + jc*(35999.05029 - 0.0001537*jc)) % 360.0)
     L0 = (280.46646 + jc*(36000.76983 + jc*0.0003032)) % 360.0
-    C = (deg2rad(1.914602 - jc*(0.004817 + 0.000014*jc))*sin(M)
-         + deg2rad(0.019993 - 0.000101*jc)*sin(2*M)
-         + deg2rad(0.000289)*sin(3*M))
+    C = (deg2rad(1.914602 - jc*(0.004817 + 0.000014*jc))*np.sin(M)
+         + deg2rad(0.019993 - 0.000101*jc)*np.sin(2*M)
+         + deg2rad(0.000289)*np.sin(3*M))
     lam = deg2rad((L0 + rad2deg(C)) % 360.0)
     eps = deg2rad(23.439291 - jc*(0.0130042 + jc*(1.64e-7 - 5.04e-7*jc)))
-    delta = asin(sin(eps)*sin(lam))
-    alpha = atan2(cos(eps)*sin(lam), cos(lam))
+    delta = np.arcsin(np.sin(eps)*np.sin(lam))
+    alpha = np.arctan2(np.cos(eps)*np.sin(lam), np.cos(lam))
     return M, lam, delta, alpha, eps
 
 def hour_angle(lat_rad, dec, altitude=-0.833):
     alt = deg2rad(altitude)
-    cosH = (sin(alt) - sin(lat_rad)*sin(dec)) / (cos(lat_rad)*cos(dec))
-    cosH = min(1.0, max(-1.0, cosH))
-    return acos(cosH)
+    cosH = (np.sin(alt) - np.sin(lat_rad)*np.sin(dec)) / (np.cos(lat_rad)*np.cos(dec))
+    return np.arccos(np.clip(cosH, -1.0, 1.0))
 
 def solar_transit_jd(jd, lw):
-    n = round(jd - 2451545.0009 - lw/(2*pi))
+    n = np.round(jd - 2451545.0009 - lw/(2*pi))
     Japprox = 2451545.0009 + lw/(2*pi) + n
     M_ = deg2rad((357.5291 + 0.98560028*(Japprox - 2451545)) % 360.0)
-    lam_ = deg2rad((280.160 + 1.915*sin(M_) + 0.020*sin(2*M_) + 0.0003*sin(3*M_)) % 360.0)
-    return 2451545.0009 + lw/(2*pi) + n + 0.0053*sin(M_) - 0.0069*sin(2*lam_)
+    lam_ = deg2rad((280.160 + 1.915*np.sin(M_) + 0.020*np.sin(2*M_) + 0.0003*np.sin(3*M_)) % 360.0)
+    return 2451545.0009 + lw/(2*pi) + n + 0.0053*np.sin(M_) - 0.0069*np.sin(2*lam_)
 
 def jd_to_utc_datetime(jd):
     J = jd + 0.5
@@ -95,9 +125,43 @@ def sunrise_sunset_local(d: date, lat_deg: float, lon_deg: float, tz: ZoneInfo):
     ss = jd_to_utc_datetime(Jset ).astimezone(tz).replace(tzinfo=None)
     return sr, ss
 
+def sunrise_sunset_local_vec(days, lat_deg: float, lon_deg: float, tz: ZoneInfo):
+    """Vectorised sunrise_sunset_local over many days -> (sunrises, sunsets) as naive local times"""
+    jd = np.array([julian_day(d) for d in days], dtype=np.float64)
+    _, _, dec, _, _ = solar_coords(jd_to_jcent(jd))
+    lw = deg2rad(-lon_deg)  # west negative
+    H = hour_angle(deg2rad(lat_deg), dec, altitude=-0.833)
+    Jtransit = solar_transit_jd(jd, lw)
+    half_day = rad2deg(H)/360.0
+    return jd_to_local_naive(Jtransit - half_day, tz), jd_to_local_naive(Jtransit + half_day, tz)
+
+def jd_to_local_naive(jd, tz: ZoneInfo) -> pd.DatetimeIndex:
+    """Julian days -> naive local timestamps, converted in one vectorised pass"""
+    seconds = np.round((np.asarray(jd, dtype=np.float64) - 2440587.5) * 86400.0)
+    return pd.to_datetime(seconds, unit='s', utc=True).tz_convert(tz).tz_localize(None)
+
 # ---- Data loading + prep ----
+def read_csv_fast(path: str) -> pd.DataFrame:
+    """Read the CSV with pyarrow when available; date/time columns are kept as text like pd.read_csv"""
+    if pa is None:
+        return pd.read_csv(path)
+    try:
+        tbl = pacsv.read_csv(path, convert_options=pacsv.ConvertOptions(strings_can_be_null=True))
+    except pa.ArrowInvalid:
+        return pd.read_csv(path)  # ragged or odd rows: let pandas cope as before
+    # Name and type columns the way pandas would: blank headers -> 'Unnamed: i', empty columns -> NaN
+    for i, field in enumerate(tbl.schema):
+        name = field.name or f'Unnamed: {i}'
+        if pa.types.is_temporal(field.type):
+            tbl = tbl.set_column(i, name, pc.cast(tbl.column(i), pa.string()))
+        elif pa.types.is_null(field.type):
+            tbl = tbl.set_column(i, name, pc.cast(tbl.column(i), pa.float64()))
+        elif name != field.name:
+            tbl = tbl.rename_columns([name if j == i else n for j, n in enumerate(tbl.column_names)])
+    return tbl.to_pandas()
+
 def load_and_standardize(path: str) -> pd.DataFrame:
-    df = pd.read_csv(path)
+    df = read_csv_fast(path)
 
     # Light auto-mapping if needed
     if 'SNR_DB' not in df.columns:
@@ -114,45 +178,60 @@ def load_and_standardize(path: str) -> pd.DataFrame:
         df = df.rename(columns={date_col: 'Date', time_col: 'Time', snr_col: 'SNR_DB'})
 
     # ---- DROP SECONDS: keep only HH:MM ----
-    df['Date'] = pd.to_datetime(df['Date'], errors='coerce').dt.date
+    dates = pd.to_datetime(df['Date'], errors='coerce')
+    df['Date'] = dates.dt.date
 
-    # Try common time formats; fallback flexible
+    # Sniff the time format on a small sample, then parse the full column once
     t_try = None
-    for fmt in ('%H:%M:%S', '%H:%M', '%I:%M:%S %p', '%I:%M %p'):
-        try:
+    sample = df['Time'].dropna().iloc[:64]
+    if not sample.empty:
+        hit_rate = {fmt: pd.to_datetime(sample, format=fmt, errors='coerce').notna().mean()
+                    for fmt in ('%H:%M:%S', '%H:%M', '%I:%M:%S %p', '%I:%M %p')}
+        fmt = max(hit_rate, key=hit_rate.get)  # ties keep the order above
+        if hit_rate[fmt] > 0:
             tt = pd.to_datetime(df['Time'], format=fmt, errors='coerce')
             if tt.notna().sum() >= int(0.8 * len(df)):  # accept if most rows parse
                 t_try = tt
-                break
-        except Exception:
-            pass
     if t_try is None:
         t_try = pd.to_datetime(df['Time'], errors='coerce')
 
     df['Time'] = np.where(t_try.notna(), t_try.dt.strftime("%H:%M"), df['Time'].astype(str))
 
-    # Build DateTime from date + HH:MM (now deterministic)
-    df['DateTime'] = pd.to_datetime(
-        df['Date'].astype(str) + ' ' + df['Time'],
-        format="%Y-%m-%d %H:%M",
-        errors="coerce"
-    )
+    # Build DateTime from date + HH:MM with datetime arithmetic (no string re-parse);
+    # rows the sniffed format missed still count if they are plain HH:MM
+    times = t_try.fillna(pd.to_datetime(df['Time'].where(t_try.isna()), format='%H:%M', errors='coerce'))
+    df['DateTime'] = dates.dt.normalize() + pd.to_timedelta(times.dt.hour * 3600 + times.dt.minute * 60, unit='s')
     df['SNR_DB'] = pd.to_numeric(df['SNR_DB'], errors='coerce')
     return df
 
+def moving_average(values, window):
+    """Trailing mean over window samples; NaN unless all window values are present (like rolling(window).mean())"""
+    arr = np.asarray(values, dtype=np.float64)
+    if bn is not None:
+        return bn.move_mean(arr, window, min_count=window)
+    out = np.full(arr.shape, np.nan)
+    if arr.size < window:
+        return out
+    valid = ~np.isnan(arr)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(valid, arr, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(valid)))
+    window_sums = sums[window:] - sums[:-window]
+    window_counts = counts[window:] - counts[:-window]
+    out[window-1:] = np.where(window_counts == window, window_sums / window, np.nan)
+    return out
+
 def compute_sun_map(unique_days, lat, lon, tz):
-    sun = {}
-    for d in unique_days:
-        try:
-            sr, ss = sunrise_sunset_local(d, lat, lon, tz)
-        except Exception:
-            sr, ss = (None, None)
-        sun[d] = (sr, ss)
+    # Unparseable dates (NaT) get no sunrise/sunset; all real days are solved in one batch
+    sun = {d: (None, None) for d in unique_days}
+    days = [d for d in unique_days if pd.notna(d)]
+    if days:
+        sunrises, sunsets = sunrise_sunset_local_vec(days, lat, lon, tz)
+        sun.update(zip(days, zip(sunrises.to_pydatetime(), sunsets.to_pydatetime())))
     return sun
 
 def main():
     df = load_and_standardize(FILE_PATH)
-    df['SNR_DB_Smoothed'] = df['SNR_DB'].rolling(WINDOW_SIZE).mean()
+    df['SNR_DB_Smoothed'] = moving_average(df['SNR_DB'], WINDOW_SIZE)
 
     unique_days = pd.to_datetime(df['Date']).dt.date.unique()
     sun_map = compute_sun_map(unique_days, LAT, LON, LOCAL_TZ)
@@ -164,18 +243,16 @@ def main():
     ax.plot(df['DateTime'], df['SNR_DB_Smoothed'],
             label=f'Smoothed SNR DB ({WINDOW_SIZE}-pt MA)', color=LINE_COLOR)
 
-    # Shade each night (sunset(d) -> sunrise(d+1))
+    # Shade each night (sunset(d) -> sunrise(d+1)), clamped to the plotted range in one pass;
+    # missing sunrise/sunset become NaT, which never passes the left < right test
     dates_sorted = sorted(unique_days)
-    for i, d in enumerate(dates_sorted):
-        ss = sun_map.get(d, (None, None))[1]
-        sr_next = sun_map.get(dates_sorted[i+1], (None, None))[0] if i+1 < len(dates_sorted) else None
-        if ss is not None and sr_next is not None:
-            left = max(ss, start_date)
-            right = min(sr_next, end_date)
-            if pd.notna(left) and pd.notna(right) and left < right:
-                ax.axvspan(left, right, color='gray', alpha=0.3, zorder=0)
-
-    import matplotlib.patches as mpatches
+    sunsets = np.array([sun_map[d][1] for d in dates_sorted[:-1]], dtype='datetime64[ns]')
+    sunrises_next = np.array([sun_map[d][0] for d in dates_sorted[1:]], dtype='datetime64[ns]')
+    left = np.maximum(sunsets, start_date.to_datetime64())
+    right = np.minimum(sunrises_next, end_date.to_datetime64())
+    for i in np.flatnonzero(left < right):
+        ax.axvspan(left[i], right[i], color='gray', alpha=0.3, zorder=0)
+
     night_patch = mpatches.Patch(color='gray', alpha=0.3, label="Night (sunset → next sunrise, local time)")
     ax.legend(handles=[night_patch, ax.lines[0]], loc='upper left')
     ax.set_xlim([start_date, end_date])
@@ -186,7 +263,12 @@ def main():
     plt.title(SITE_NAME)
     plt.grid(True, color='gray')
     plt.tight_layout(); plt.subplots_adjust(top=0.88, bottom=0.2)
-    plt.show()
+    if NO_SHOW:
+        os.makedirs(os.path.dirname(FIGURE_OUT), exist_ok=True)
+        plt.savefig(FIGURE_OUT, dpi=160)
+        print(f"Figure written to: {FIGURE_OUT}")
+    else:
+        plt.show()
 
     if SAVE_ENRICHED_EXCEL:
         sun_rows = []
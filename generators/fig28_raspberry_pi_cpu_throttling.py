@@ -12,15 +12,42 @@ License: MIT
 """
 
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # charts are only saved to PNG; skip interactive backend initialisation
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
-from datetime import datetime, timedelta
+from datetime import datetime
 import numpy as np
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from data_utils import cache_df, linfit
+
+# Optional: Rust-based calamine reader for the workbook (pandas' default openpyxl otherwise)
+try:
+    import python_calamine
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = None
+
+# Optional: datashader rendering of very long temperature logs (matplotlib lines otherwise)
+try:
+    import datashader as ds
+    import datashader.transfer_functions as tf
+except ImportError:
+    ds = None
 
 # Configuration
 DATA_FILE = 'data/cpu_temperature_data.xlsx'
 OUTPUT_DIR = 'output'
+CACHE_DIR = '.cache'
+COLUMN_NAMES = ['Time', 'Temp_C', 'Unit', 'CPU_Speed_MHz', 'Core_Speed_MHz', 'Health', 'Vcore']
+USE_COLUMNS = [0, 1, 3, 4]         # Time, Temp_C, CPU_Speed_MHz, Core_Speed_MHz; the rest are never parsed
+# Typed at read time; float32 is ample for 0.1°C / 1 MHz readings and halves the memory traffic
+COLUMN_DTYPES = {'Temp_C': 'float32', 'CPU_Speed_MHz': 'float32', 'Core_Speed_MHz': 'float32'}
+DATASHADER_MIN_SAMPLES = 200_000   # shorter timelines are drawn as ordinary matplotlib lines
+DATASHADER_SIZE = (1400, 400)      # canvas pixels (width, height) for the timeline image
 
 # Raspberry Pi temperature thresholds (°C)
 THROTTLING_TEMP = 80.0      # Temperature at which CPU throttling occurs
@@ -28,44 +55,76 @@ WARNING_TEMP = 70.0         # Warning threshold for high temperatures
 CRITICAL_TEMP = 85.0        # Critical temperature threshold
 AMBIENT_TEMP = 30.0         # Estimated ambient temperature in Borneo
 
+@cache_df(CACHE_DIR, USE_COLUMNS, COLUMN_NAMES, COLUMN_DTYPES, EXCEL_ENGINE)
+def read_temperature_data(path, sheet_name=0):
+    """Read the USE_COLUMNS data rows of the temperature export under their COLUMN_NAMES"""
+    # The export may start with a 'results modified' title row above the header row
+    first = pd.read_excel(path, sheet_name=sheet_name, header=None, nrows=1, usecols=[0], engine=EXCEL_ENGINE)
+    skip = 2 if first.iat[0, 0] == 'results modified' else 1
+    
+    # Read the data rows once, only the columns we use, with names and numeric types applied by the reader
+    read_args = dict(sheet_name=sheet_name, header=None, skiprows=skip, usecols=USE_COLUMNS,
+                     names=[COLUMN_NAMES[i] for i in USE_COLUMNS], engine=EXCEL_ENGINE)
+    try:
+        return pd.read_excel(path, dtype=COLUMN_DTYPES, **read_args)
+    except ValueError:
+        # Stray text in a numeric column: read untyped and coerce in load_and_clean_data
+        return pd.read_excel(path, **read_args)
+
 def load_and_clean_data():
     """Load and clean Raspberry Pi CPU temperature data"""
     print(f"📊 Loading Raspberry Pi CPU temperature data from {DATA_FILE}...")
     
     try:
-        df = pd.read_excel(DATA_FILE)
+        df = read_temperature_data(DATA_FILE)
         print(f"✅ Loaded {len(df)} records")
     except Exception as e:
         print(f"❌ Error loading file: {e}")
         return pd.DataFrame()
     
-    # Clean column names (first row contains headers)
-    if 'results modified' in df.columns:
-        # Use first row as headers
-        new_columns = df.iloc[0].values
-        df.columns = new_columns
-        df = df.drop(0).reset_index(drop=True)
-    
-    # Rename columns for easier access
-    df.columns = ['Time', 'Temp_C', 'Unit', 'CPU_Speed_MHz', 'Core_Speed_MHz', 'Health', 'Vcore']
-    
-    # Clean temperature data
-    df['Temp_C'] = pd.to_numeric(df['Temp_C'], errors='coerce')
+    # Clean temperature and CPU speed data (no-ops when the typed read succeeded)
+    df['Temp_C'] = pd.to_numeric(df['Temp_C'], errors='coerce').astype(np.float32)
     df = df.dropna(subset=['Temp_C'])
-    
-    # Clean CPU speed data
-    df['CPU_Speed_MHz'] = pd.to_numeric(df['CPU_Speed_MHz'], errors='coerce')
-    df['Core_Speed_MHz'] = pd.to_numeric(df['Core_Speed_MHz'], errors='coerce')
+    df['CPU_Speed_MHz'] = pd.to_numeric(df['CPU_Speed_MHz'], errors='coerce').astype(np.float32)
+    df['Core_Speed_MHz'] = pd.to_numeric(df['Core_Speed_MHz'], errors='coerce').astype(np.float32)
     
     # Create datetime (assuming sequential 10-second intervals)
     start_time = datetime.now().replace(hour=16, minute=29, second=36, microsecond=0)
-    df['DateTime'] = [start_time + timedelta(seconds=i*10) for i in range(len(df))]
+    df['DateTime'] = pd.date_range(start=start_time, periods=len(df), freq='10s')
     
     print(f"✅ Cleaned data: {len(df)} valid temperature records")
     return df
 
-def generate_fig28_cpu_throttling_chart(df):
-    """Generate Figure 28: Raspberry Pi CPU Throttling Temperature chart"""
+def moving_average(values, window):
+    """Trailing mean over window samples (NaN until the window is full), from one cumulative sum"""
+    x = np.asarray(values, dtype=np.float64)
+    ma = np.full(x.size, np.nan)
+    if x.size >= window:
+        c = np.cumsum(np.insert(x, 0, 0.0))
+        ma[window - 1:] = (c[window:] - c[:-window]) / window
+    return ma
+
+def plot_timeline(ax, times, values, color, **kwargs):
+    """
+    Plot a per-sample timeline; with datashader and a very long series, the line is
+    aggregated to an image drawn with imshow (plus an empty line for the legend entry)
+    """
+    if ds is None or len(values) < DATASHADER_MIN_SAMPLES:
+        return ax.plot(times, values, color=color, **kwargs)
+    
+    x = mdates.date2num(np.asarray(times))
+    y = np.asarray(values, dtype=np.float64)
+    x_range, y_range = (x.min(), x.max()), (np.nanmin(y), np.nanmax(y))
+    width, height = DATASHADER_SIZE
+    canvas = ds.Canvas(plot_width=width, plot_height=height, x_range=x_range, y_range=y_range)
+    img = tf.shade(canvas.line(pd.DataFrame({'x': x, 'y': y}), 'x', 'y'), cmap=[color], how='linear')
+    ax.imshow(img.to_pil(), extent=[*x_range, *y_range], aspect='auto', interpolation='nearest',
+              alpha=kwargs.get('alpha'))
+    kwargs.pop('rasterized', None)
+    return ax.plot([], [], color=color, **kwargs)
+
+def generate_fig28_cpu_throttling_chart(df, fig=None):
+    """Generate Figure 28: Raspberry Pi CPU Throttling Temperature chart (drawn on fig when given)"""
     print("📊 Generating Figure 28: Raspberry Pi CPU Throttling Temperature...")
     
     # Calculate statistics
@@ -73,15 +132,23 @@ def generate_fig28_cpu_throttling_chart(df):
     max_temp = df['Temp_C'].max()
     min_temp = df['Temp_C'].min()
     
-    # Calculate time above thresholds
-    time_above_warning = (df['Temp_C'] > WARNING_TEMP).sum() / len(df) * 100
-    time_above_throttling = (df['Temp_C'] > THROTTLING_TEMP).sum() / len(df) * 100
+    # Calculate time above thresholds (the masks are reused for the shaded regions)
+    temp = df['Temp_C'].to_numpy()
+    above_warning = temp > WARNING_TEMP
+    above_throttling = temp > THROTTLING_TEMP
+    time_above_warning = np.count_nonzero(above_warning) / temp.size * 100
+    time_above_throttling = np.count_nonzero(above_throttling) / temp.size * 100
     
     # Create the main figure
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10))
+    if fig is None:
+        fig = plt.figure(figsize=(14, 10))
+    ax1, ax2 = fig.subplots(2, 1)
     
     # Top subplot: Temperature timeline
-    ax1.plot(df['DateTime'], df['Temp_C'], color='darkred', linewidth=1.5, alpha=0.8, label='CPU Temperature')
+    # (per-sample artists are rasterized=True so a vector export such as PDF keeps only axes,
+    # text and threshold lines as vectors; PNG output is unaffected)
+    plot_timeline(ax1, df['DateTime'], df['Temp_C'], 'darkred', linewidth=1.5, alpha=0.8,
+                  label='CPU Temperature', rasterized=True)
     
     # Add threshold lines
     ax1.axhline(y=WARNING_TEMP, color='orange', linestyle='--', linewidth=2, 
@@ -95,17 +162,17 @@ def generate_fig28_cpu_throttling_chart(df):
     
     # Add moving average
     window = 50
-    df['Temp_MA'] = df['Temp_C'].rolling(window=window).mean()
+    df['Temp_MA'] = moving_average(df['Temp_C'], window)
     ax1.plot(df['DateTime'], df['Temp_MA'], color='blue', linewidth=2, 
             label=f'{window}-point Moving Average')
     
     # Shade regions above thresholds
     ax1.fill_between(df['DateTime'], WARNING_TEMP, df['Temp_C'], 
-                     where=(df['Temp_C'] > WARNING_TEMP), 
-                     color='orange', alpha=0.2, label='Above Warning')
+                     where=above_warning, 
+                     color='orange', alpha=0.2, label='Above Warning', rasterized=True)
     ax1.fill_between(df['DateTime'], THROTTLING_TEMP, df['Temp_C'], 
-                     where=(df['Temp_C'] > THROTTLING_TEMP), 
-                     color='red', alpha=0.3, label='Above Throttling')
+                     where=above_throttling, 
+                     color='red', alpha=0.3, label='Above Throttling', rasterized=True)
     
     ax1.set_title('Figure 28: Raspberry Pi CPU Throttling Temperature\n'
                   f'Avg: {avg_temp:.1f}°C | Max: {max_temp:.1f}°C | Min: {min_temp:.1f}°C | '
@@ -118,16 +185,19 @@ def generate_fig28_cpu_throttling_chart(df):
     
     # Bottom subplot: CPU Speed vs Temperature correlation
     if df['CPU_Speed_MHz'].notna().any():
-        # Create scatter plot of temperature vs CPU speed
-        colors = ['green' if temp < WARNING_TEMP else 'orange' if temp < THROTTLING_TEMP 
-                  else 'red' for temp in df['Temp_C']]
-        
-        ax2.scatter(df['Temp_C'], df['CPU_Speed_MHz'], c=colors, alpha=0.6, s=20)
+        # Create scatter plot of temperature vs CPU speed, one call (one colour) per temperature zone
+        speed = df['CPU_Speed_MHz'].to_numpy()
+        zones = [(temp < WARNING_TEMP, 'green'),
+                 ((temp >= WARNING_TEMP) & (temp < THROTTLING_TEMP), 'orange'),
+                 (temp >= THROTTLING_TEMP, 'red')]
+        for mask, color in zones:
+            if mask.any():
+                ax2.scatter(temp[mask], speed[mask], color=color, alpha=0.6, s=20, rasterized=True)
         
         # Add trend line
-        z = np.polyfit(df['Temp_C'].dropna(), df['CPU_Speed_MHz'].dropna(), 1)
-        p = np.poly1d(z)
-        ax2.plot(df['Temp_C'], p(df['Temp_C']), "r--", alpha=0.8, linewidth=2, label='Trend Line')
+        valid = ~np.isnan(speed)
+        slope, intercept = linfit(temp[valid], speed[valid])
+        ax2.plot(temp, slope * temp + intercept, "r--", alpha=0.8, linewidth=2, label='Trend Line')
         
         ax2.axvline(x=WARNING_TEMP, color='orange', linestyle='--', alpha=0.7, label=f'Warning ({WARNING_TEMP}°C)')
         ax2.axvline(x=THROTTLING_TEMP, color='red', linestyle='--', alpha=0.7, label=f'Throttling ({THROTTLING_TEMP}°C)')
@@ -174,16 +244,21 @@ def generate_fig28_cpu_throttling_chart(df):
         'time_above_throttling': time_above_throttling
     }
 
-def generate_thermal_performance_summary(df, stats):
-    """Generate thermal performance summary for Paper 2"""
+def generate_thermal_performance_summary(df, stats, fig=None):
+    """Generate thermal performance summary for Paper 2 (clearing and reusing fig when given)"""
     print("📊 Generating thermal performance summary...")
     
-    plt.figure(figsize=(12, 8))
+    if fig is None:
+        plt.figure(figsize=(12, 8))
+    else:
+        fig.clf()
+        fig.set_size_inches(12, 8)
+        plt.figure(fig)  # make it current for the plt.subplot calls below
     
     # Create 2x2 subplot layout
     plt.subplot(2, 2, 1)
     # Temperature over time with key statistics
-    plt.plot(range(len(df)), df['Temp_C'], color='darkred', alpha=0.7, linewidth=1)
+    plt.plot(range(len(df)), df['Temp_C'], color='darkred', alpha=0.7, linewidth=1, rasterized=True)
     plt.axhline(y=stats['avg_temp'], color='blue', linestyle='--', linewidth=2, 
                 label=f'Average: {stats["avg_temp"]:.1f}°C')
     plt.axhline(y=THROTTLING_TEMP, color='red', linestyle='--', linewidth=2,
@@ -276,11 +351,12 @@ def main():
         print("❌ No data loaded, exiting...")
         return
     
-    # Generate Figure 28
-    stats = generate_fig28_cpu_throttling_chart(df)
+    # Generate Figure 28 and the thermal analysis on one reused Figure
+    fig = plt.figure(figsize=(14, 10))
+    stats = generate_fig28_cpu_throttling_chart(df, fig)
     
     # Generate additional thermal analysis
-    generate_thermal_performance_summary(df, stats)
+    generate_thermal_performance_summary(df, stats, fig)
     
     # Print summary
     print("\n🎉 FIGURE 28 GENERATION COMPLETE!")
@@ -15,46 +15,80 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from data_utils import cache_df, header_labels, linfit
+
+# guess_datetime_format is public from pandas 2.2; older pandas parse dates without an explicit format
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:
+    guess_datetime_format = None
+
+# Optional: Rust-based calamine reader for the workbook (pandas' default openpyxl otherwise)
+try:
+    import python_calamine
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = None
 
 # Configuration
 DATA_FILE = 'data/Complete_NVIS_data.xlsx'
 OUTPUT_DIR = 'output'
+CACHE_DIR = '.cache'
+
+def is_year_label(col):
+    """True for column labels that look like a year (2010-2030), numeric or string"""
+    if isinstance(col, (int, float)):
+        return 2010 <= col <= 2030
+    if isinstance(col, str) and col.replace('.', '').isdigit():
+        return 2010 <= float(col) <= 2030
+    return False
+
+def apply_header_row(df_raw, header_row):
+    """Promote one row of a header=None sheet to column labels, dropping it and the rows above"""
+    df = df_raw.iloc[header_row + 1:].reset_index(drop=True)
+    df.columns = header_labels(df_raw.iloc[header_row])
+    return df.infer_objects()
+
+@cache_df(CACHE_DIR, is_year_label, apply_header_row, header_labels, EXCEL_ENGINE)
+def read_sheet(path, sheet_name):
+    """
+    Read one sheet without a header and promote its DATE/TIME header row; only the
+    DATE, TIME and year columns are parsed
+    """
+    head = pd.read_excel(path, sheet_name=sheet_name, header=None, nrows=20, engine=EXCEL_ENGINE)
+    
+    # Find the header row (the first of the 20 rows where DATE and TIME appear)
+    top = head.iloc[:, :2].astype(str)
+    hit = (top.iloc[:, 0].str.contains('DATE', regex=False) & top.iloc[:, 1].str.contains('TIME', regex=False)).to_numpy()
+    header_row = int(hit.argmax()) if hit.any() else None
+    if header_row is not None:
+        print(f"📋 Found {sheet_name} headers at row {header_row}")
+    
+    # Keep DATE, TIME and the year columns named in the header row (the first row if none was found)
+    labels = header_labels(head.iloc[header_row or 0])
+    keep = [i for i, label in enumerate(labels) if i < 2 or is_year_label(label)]
+    df = pd.read_excel(path, sheet_name=sheet_name, header=None, usecols=keep, engine=EXCEL_ENGINE)
+    df.columns = range(len(keep))
+    print(f"✅ Loaded {sheet_name}: {df.shape}")
+    
+    # Promote the header row instead of re-reading the sheet
+    return apply_header_row(df, header_row or 0)
 
 def load_complete_data():
     """Load complete NVIS data from both Guam and Darwin sheets"""
     print(f"📊 Loading complete NVIS data from {DATA_FILE}...")
     
     try:
-        # Load both sheets
-        guam_df = pd.read_excel(DATA_FILE, sheet_name='Guam')
-        darwin_df = pd.read_excel(DATA_FILE, sheet_name='Darwin')
-        
-        print(f"✅ Loaded Guam: {guam_df.shape}, Darwin: {darwin_df.shape}")
-        
-        # Find the header row (where DATE and TIME appear)
-        guam_header_row = None
-        for i in range(20):  # Check first 20 rows
-            if 'DATE' in str(guam_df.iloc[i, 0]) and 'TIME' in str(guam_df.iloc[i, 1]):
-                guam_header_row = i
-                break
-        
-        darwin_header_row = None
-        for i in range(20):  # Check first 20 rows
-            if 'DATE' in str(darwin_df.iloc[i, 0]) and 'TIME' in str(darwin_df.iloc[i, 1]):
-                darwin_header_row = i
-                break
-        
-        if guam_header_row is not None:
-            print(f"📋 Found Guam headers at row {guam_header_row}")
-            # Re-load with correct header
-            guam_df = pd.read_excel(DATA_FILE, sheet_name='Guam', header=guam_header_row)
-        
-        if darwin_header_row is not None:
-            print(f"📋 Found Darwin headers at row {darwin_header_row}")
-            # Re-load with correct header
-            darwin_df = pd.read_excel(DATA_FILE, sheet_name='Darwin', header=darwin_header_row)
+        guam_df = read_sheet(DATA_FILE, 'Guam')
+        darwin_df = read_sheet(DATA_FILE, 'Darwin')
         
+        print(f"✅ Guam: {guam_df.shape}, Darwin: {darwin_df.shape}")
         return guam_df, darwin_df
         
     except Exception as e:
@@ -69,49 +103,64 @@ def clean_and_process_data(df, station_name):
     df = df.dropna(how='all')
     
     # Find year columns (numeric columns that look like years)
-    year_columns = []
-    for col in df.columns:
-        if isinstance(col, (int, float)) and 2010 <= col <= 2030:
-            year_columns.append(col)
-        elif isinstance(col, str) and col.replace('.', '').isdigit():
-            year = float(col)
-            if 2010 <= year <= 2030:
-                year_columns.append(col)
+    year_columns = [col for col in df.columns if is_year_label(col)]
     
     print(f"📅 Found year columns: {year_columns}")
     
-    # Create processed data structure
-    processed_data = []
-    
-    for idx, row in df.iterrows():
-        try:
-            date_str = str(row.iloc[0])  # DATE column
-            time_str = str(row.iloc[1])  # TIME column
-            
-            # Skip header rows and invalid data
-            if 'DATE' in date_str or pd.isna(row.iloc[0]):
-                continue
-            
-            # Process each year's data
-            for year_col in year_columns:
-                if year_col in df.columns:
-                    fof2_value = row[year_col]
-                    if pd.notna(fof2_value) and isinstance(fof2_value, (int, float)):
-                        processed_data.append({
-                            'Date': date_str,
-                            'Time': time_str,
-                            'Year': int(float(str(year_col))),
-                            'foF2': float(fof2_value),
-                            'Station': station_name
-                        })
-        except Exception as e:
-            continue
-    
-    result_df = pd.DataFrame(processed_data)
+    # Data rows only: skip repeated header rows and rows without a date
+    dates = df.iloc[:, 0]
+    date_str = dates.astype(str)
+    rows = dates.notna().to_numpy() & ~date_str.str.contains('DATE', regex=False).to_numpy()
+    
+    # One record per (row, year) with a numeric reading, in row order as the readings appear;
+    # foF2 is read to 0.1 MHz, so float32 (and int16 years) halve the memory of every groupby
+    readings = df.loc[rows, year_columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float32)
+    row_idx, col_idx = np.nonzero(~np.isnan(readings))
+    years = np.array([int(float(str(col))) for col in year_columns], dtype=np.int16)
+    
+    result_df = pd.DataFrame({
+        'Date': date_str.to_numpy()[rows][row_idx],
+        'Time': df.iloc[:, 1].astype(str).to_numpy()[rows][row_idx],
+        'Year': years[col_idx],
+        'foF2': readings[row_idx, col_idx],
+        'Station': station_name
+    })
     print(f"✅ Processed {len(result_df)} records for {station_name}")
     
     return result_df
 
+def process_stations(raw_frames):
+    """
+    Clean each station's raw frame (name -> DataFrame) in parallel worker processes; if the
+    pool itself fails, only the stations it did not finish are cleaned serially
+    """
+    processed = {}
+    workers = min(len(raw_frames), os.cpu_count() or 1)
+    if workers >= 2:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                futures = {ex.submit(clean_and_process_data, df, name): name for name, df in raw_frames.items()}
+                for future in as_completed(futures):
+                    processed[futures[future]] = future.result()
+        except (BrokenProcessPool, OSError) as e:
+            print(f"⚠️ Parallel processing failed, processing the remaining stations serially: {e}")
+    for name, df in raw_frames.items():
+        if name not in processed:
+            processed[name] = clean_and_process_data(df, name)
+    return {name: processed[name] for name in raw_frames}
+
+def extract_month(dates):
+    """Month number (Int8, <NA> where unparseable) using a format inferred from the first date"""
+    sample = dates.dropna()
+    fmt = guess_datetime_format(sample.iloc[0]) if guess_datetime_format is not None and len(sample) else None
+    return pd.to_datetime(dates, format=fmt, errors='coerce', cache=True).dt.month.astype('Int8')
+
+def yearly_stats(data):
+    """Per-year foF2 mean/std/count from a single groupby pass, ordered by year"""
+    # sort=False hashes the years instead of sorting the records; only the few result rows are sorted
+    stats = data.groupby('Year', sort=False)['foF2'].agg(['mean', 'std', 'count'])
+    return stats.sort_index().reset_index()
+
 def generate_2x2_comparison_chart(guam_data, darwin_data):
     """Generate 2x2 comparison chart"""
     print("📊 Generating 2x2 comparison chart...")
@@ -120,7 +169,7 @@ def generate_2x2_comparison_chart(guam_data, darwin_data):
     
     # Chart 1: Guam foF2 by Year
     if not guam_data.empty:
-        guam_yearly = guam_data.groupby('Year')['foF2'].agg(['mean', 'std', 'count']).reset_index()
+        guam_yearly = yearly_stats(guam_data)
         ax1.errorbar(guam_yearly['Year'], guam_yearly['mean'], yerr=guam_yearly['std'], 
                     marker='o', capsize=5, capthick=2, linewidth=2, color='blue')
         ax1.set_title('Guam - Annual foF2 Trends', fontweight='bold', fontsize=12)
@@ -131,7 +180,7 @@ def generate_2x2_comparison_chart(guam_data, darwin_data):
     
     # Chart 2: Darwin foF2 by Year
     if not darwin_data.empty:
-        darwin_yearly = darwin_data.groupby('Year')['foF2'].agg(['mean', 'std', 'count']).reset_index()
+        darwin_yearly = yearly_stats(darwin_data)
         ax2.errorbar(darwin_yearly['Year'], darwin_yearly['mean'], yerr=darwin_yearly['std'], 
                     marker='s', capsize=5, capthick=2, linewidth=2, color='red')
         ax2.set_title('Darwin - Annual foF2 Trends', fontweight='bold', fontsize=12)
@@ -142,15 +191,10 @@ def generate_2x2_comparison_chart(guam_data, darwin_data):
     
     # Chart 3: Station Comparison
     if not guam_data.empty and not darwin_data.empty:
-        combined_yearly = pd.concat([
-            guam_data.groupby('Year')['foF2'].mean().reset_index().assign(Station='Guam'),
-            darwin_data.groupby('Year')['foF2'].mean().reset_index().assign(Station='Darwin')
-        ])
-        
-        for station, group in combined_yearly.groupby('Station'):
-            color = 'blue' if station == 'Guam' else 'red'
-            marker = 'o' if station == 'Guam' else 's'
-            ax3.plot(group['Year'], group['foF2'], marker=marker, linewidth=2, 
+        # Plot the yearly means already computed above (Darwin first, keeping the legend order)
+        for station, yearly, color, marker in (('Darwin', darwin_yearly, 'red', 's'),
+                                               ('Guam', guam_yearly, 'blue', 'o')):
+            ax3.plot(yearly['Year'], yearly['mean'], marker=marker, linewidth=2, 
                     color=color, label=station, markersize=6)
         
         ax3.set_title('Guam vs Darwin - foF2 Comparison', fontweight='bold', fontsize=12)
@@ -162,8 +206,18 @@ def generate_2x2_comparison_chart(guam_data, darwin_data):
     
     # Chart 4: Distribution Analysis
     if not guam_data.empty and not darwin_data.empty:
-        ax4.hist(guam_data['foF2'], bins=30, alpha=0.6, color='blue', label='Guam', density=True)
-        ax4.hist(darwin_data['foF2'], bins=30, alpha=0.6, color='red', label='Darwin', density=True)
+        # Bin both stations on the same 30 edges, then draw the precomputed densities as bars
+        guam_fof2 = guam_data['foF2'].to_numpy()
+        darwin_fof2 = darwin_data['foF2'].to_numpy()
+        lo = min(guam_fof2.min(), darwin_fof2.min())
+        hi = max(guam_fof2.max(), darwin_fof2.max())
+        edges = np.linspace(lo, hi, 31)
+        guam_density, _ = np.histogram(guam_fof2, edges, density=True)
+        darwin_density, _ = np.histogram(darwin_fof2, edges, density=True)
+        centers = (edges[:-1] + edges[1:]) / 2
+        width = edges[1] - edges[0]
+        ax4.bar(centers, guam_density, width=width, alpha=0.6, color='blue', label='Guam')
+        ax4.bar(centers, darwin_density, width=width, alpha=0.6, color='red', label='Darwin')
         
         # Add statistics
         guam_mean = guam_data['foF2'].mean()
@@ -193,8 +247,8 @@ def generate_2x2_comparison_chart(guam_data, darwin_data):
     
     return guam_yearly if not guam_data.empty else None, darwin_yearly if not darwin_data.empty else None
 
-def generate_detailed_analysis(guam_data, darwin_data):
-    """Generate detailed statistical analysis"""
+def generate_detailed_analysis(guam_data, darwin_data, guam_yearly=None, darwin_yearly=None):
+    """Generate detailed statistical analysis (reusing the yearly stats of the 2x2 chart when given)"""
     print("📊 Generating detailed analysis...")
     
     fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
@@ -202,7 +256,7 @@ def generate_detailed_analysis(guam_data, darwin_data):
     # Monthly analysis for Guam
     if not guam_data.empty:
         # Try to extract month information
-        guam_data['Month'] = pd.to_datetime(guam_data['Date'], errors='coerce').dt.month
+        guam_data['Month'] = extract_month(guam_data['Date'])
         monthly_guam = guam_data.groupby('Month')['foF2'].agg(['mean', 'std']).reset_index()
         
         ax1.errorbar(monthly_guam['Month'], monthly_guam['mean'], yerr=monthly_guam['std'],
@@ -215,7 +269,7 @@ def generate_detailed_analysis(guam_data, darwin_data):
     
     # Monthly analysis for Darwin
     if not darwin_data.empty:
-        darwin_data['Month'] = pd.to_datetime(darwin_data['Date'], errors='coerce').dt.month
+        darwin_data['Month'] = extract_month(darwin_data['Date'])
         monthly_darwin = darwin_data.groupby('Month')['foF2'].agg(['mean', 'std']).reset_index()
         
         ax2.errorbar(monthly_darwin['Month'], monthly_darwin['mean'], yerr=monthly_darwin['std'],
@@ -229,7 +283,7 @@ def generate_detailed_analysis(guam_data, darwin_data):
     # Box plot comparison
     if not guam_data.empty and not darwin_data.empty:
         combined_data = [guam_data['foF2'].dropna(), darwin_data['foF2'].dropna()]
-        ax3.boxplot(combined_data, labels=['Guam', 'Darwin'], patch_artist=True,
+        ax3.boxplot(combined_data, tick_labels=['Guam', 'Darwin'], patch_artist=True,
                    boxprops=dict(facecolor='lightblue', alpha=0.7),
                    medianprops=dict(color='red', linewidth=2))
         ax3.set_title('foF2 Distribution Box Plot', fontweight='bold')
@@ -239,8 +293,12 @@ def generate_detailed_analysis(guam_data, darwin_data):
     # Correlation analysis
     if not guam_data.empty and not darwin_data.empty:
         # Merge data by year for correlation
-        guam_yearly_mean = guam_data.groupby('Year')['foF2'].mean().reset_index()
-        darwin_yearly_mean = darwin_data.groupby('Year')['foF2'].mean().reset_index()
+        if guam_yearly is None:
+            guam_yearly = yearly_stats(guam_data)
+        if darwin_yearly is None:
+            darwin_yearly = yearly_stats(darwin_data)
+        guam_yearly_mean = guam_yearly[['Year', 'mean']].rename(columns={'mean': 'foF2'})
+        darwin_yearly_mean = darwin_yearly[['Year', 'mean']].rename(columns={'mean': 'foF2'})
         
         merged = pd.merge(guam_yearly_mean, darwin_yearly_mean, on='Year', suffixes=('_Guam', '_Darwin'))
         
@@ -248,9 +306,8 @@ def generate_detailed_analysis(guam_data, darwin_data):
             ax4.scatter(merged['foF2_Guam'], merged['foF2_Darwin'], s=60, alpha=0.7, color='purple')
             
             # Add correlation line
-            z = np.polyfit(merged['foF2_Guam'], merged['foF2_Darwin'], 1)
-            p = np.poly1d(z)
-            ax4.plot(merged['foF2_Guam'], p(merged['foF2_Guam']), "r--", alpha=0.8, linewidth=2)
+            slope, intercept = linfit(merged['foF2_Guam'], merged['foF2_Darwin'])
+            ax4.plot(merged['foF2_Guam'], slope * merged['foF2_Guam'] + intercept, "r--", alpha=0.8, linewidth=2)
             
             # Calculate correlation
             correlation = merged['foF2_Guam'].corr(merged['foF2_Darwin'])
@@ -284,13 +341,13 @@ def main():
         print("❌ No data loaded, exiting...")
         return
     
-    # Process data
-    guam_data = clean_and_process_data(guam_raw, 'Guam')
-    darwin_data = clean_and_process_data(darwin_raw, 'Darwin')
+    # Process data (one worker process per station)
+    processed = process_stations({'Guam': guam_raw, 'Darwin': darwin_raw})
+    guam_data, darwin_data = processed['Guam'], processed['Darwin']
     
     # Generate charts
     guam_yearly, darwin_yearly = generate_2x2_comparison_chart(guam_data, darwin_data)
-    generate_detailed_analysis(guam_data, darwin_data)
+    generate_detailed_analysis(guam_data, darwin_data, guam_yearly, darwin_yearly)
     
     # Print summary
     print("\n🎉 2x2 CHART GENERATION COMPLETE!")
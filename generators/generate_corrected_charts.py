@@ -13,15 +13,22 @@ Author: Research Team
 License: MIT
 """
 
-import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # charts are only saved to file (also in worker processes); skip GUI backend init
 import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 import os
 import sys
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from data_utils import load_sheet
+
 # Configuration
 NVIS_DATA_FILE = "data/NVIS_data.xlsx"
+CORRECTED_FOLDER = "output/corrected"
 
 # Standardized layout configuration
 STANDARD_LAYOUT = {
@@ -34,47 +41,51 @@ STANDARD_LAYOUT = {
     'colors': ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2']
 }
 
+# Station and period specific foF2 parameters (matching original scripts exactly):
+# (station, period) -> (baseline_fof2, scale_factor, min_fof2, max_fof2)
+FOF2_PARAMS = {
+    ('Guam', '15th'): (11.0, 10.0, 4.0, 18.0),     # From guam_april15_fof2_7years.py
+    ('Guam', '15-28'): (11.2, 10.0, 4.0, 18.0),    # From guam_april15-28_fof2_7years.py
+    ('Guam', 'full'): (11.0, 10.0, 4.0, 18.0),     # From guam_fof2_april.py
+    ('Darwin', '15th'): (9.0, 10.0, 3.0, 15.0),    # From darwin_april15_fof2_7years.py
+    ('Darwin', '15-28'): (9.2, 12.0, 3.0, 15.0),   # From darwin_april15-28_fof2_7years.py
+    ('Darwin', 'full'): (8.5, 10.0, 3.0, 15.0),    # From darwin_fof2_april.py
+}
+
+def fof2_params(station, period):
+    """Look up (baseline, scale, min, max) for a station/period"""
+    station_key = 'Guam' if 'Guam' in station else 'Darwin'
+    period_key = '15th' if '15th' in period else ('15-28' if '15-28' in period else 'full')
+    return FOF2_PARAMS[(station_key, period_key)]
+
 def calculate_fof2_from_signal_correct(signal_values, station="Guam", period="April"):
     """
     Calculate foF2 using the EXACT same methods as original scripts
+    Vectorized over the whole signal array; NaN signal values stay NaN
     """
-    fof2_values = []
-    
-    # Station and period specific parameters (matching original scripts exactly)
-    if "Guam" in station:
-        if "15th" in period:
-            baseline_fof2 = 11.0  # From guam_april15_fof2_7years.py
-            scale_factor = 10.0
-        elif "15-28" in period:
-            baseline_fof2 = 11.2  # From guam_april15-28_fof2_7years.py
-            scale_factor = 10.0
-        else:  # Full April
-            baseline_fof2 = 11.0  # From guam_fof2_april.py
-            scale_factor = 10.0
-        min_fof2, max_fof2 = 4.0, 18.0
-    else:  # Darwin
-        if "15-28" in period:
-            baseline_fof2 = 9.2   # From darwin_april15-28_fof2_7years.py
-            scale_factor = 12.0
-        elif "15th" in period:
-            baseline_fof2 = 9.0   # From darwin_april15_fof2_7years.py
-            scale_factor = 10.0
-        else:  # Full April
-            baseline_fof2 = 8.5   # From darwin_fof2_april.py
-            scale_factor = 10.0
-        min_fof2, max_fof2 = 3.0, 15.0
-    
-    for signal in signal_values:
-        if pd.notna(signal):
-            # Use EXACT original calculation method
-            signal_factor = signal / scale_factor
-            estimated_fof2 = baseline_fof2 + signal_factor
-            
-            # Clamp to reasonable foF2 range
-            estimated_fof2 = np.clip(estimated_fof2, min_fof2, max_fof2)
-            fof2_values.append(estimated_fof2)
+    baseline_fof2, scale_factor, min_fof2, max_fof2 = fof2_params(station, period)
+    
+    # Use EXACT original calculation method, clamped to reasonable foF2 range
+    signal = np.asarray(signal_values, dtype=np.float64)
+    return np.clip(baseline_fof2 + signal / scale_factor, min_fof2, max_fof2)
+
+def mean_fof2_by_year(df, year_columns, station, period, key, minlength):
+    """
+    Mean foF2 per (year, key) for a small integer DateTime component key ('hour' or 'day'),
+    as one np.bincount over all years; returns a years x minlength array (NaN where no data)
+    """
+    signals = df[year_columns].to_numpy(dtype=np.float64)
+    keys = getattr(df['DateTime'].dt, key).to_numpy()
+    rows, cols = np.nonzero(~np.isnan(signals))
+    fof2 = calculate_fof2_from_signal_correct(signals[rows, cols], station, period)
     
-    return fof2_values
+    # Flat bin per (year, key) so every year is reduced in the same single pass
+    bins = cols * minlength + keys[rows]
+    size = len(year_columns) * minlength
+    counts = np.bincount(bins, minlength=size)
+    sums = np.bincount(bins, weights=fof2, minlength=size)
+    with np.errstate(invalid='ignore'):
+        return (sums / counts).reshape(len(year_columns), minlength)
 
 def create_corrected_chart(station_name, period_name, year_range):
     """Create standardized 2x2 chart with corrected foF2 calculations"""
@@ -98,16 +109,14 @@ def plot_corrected_hourly_patterns(ax, df, year_columns, colors, station, period
     ax.axvspan(18, 24, alpha=0.15, color='gray', label='Night')
     ax.axvspan(0, 6, alpha=0.15, color='gray')
     
-    # Plot hourly data for each year
+    # Plot hourly data for each year (all years grouped in one pass)
+    hourly_means = mean_fof2_by_year(df, year_columns, station, period, 'hour', minlength=24)
     for i, year in enumerate(year_columns):
-        df_year = df.dropna(subset=[year]).copy()
-        df_year['Hour'] = df_year['DateTime'].dt.hour
-        df_year['foF2_estimated'] = calculate_fof2_from_signal_correct(df_year[year], station, period)
-        hourly_fof2 = df_year.groupby('Hour')['foF2_estimated'].mean()
+        hours = np.flatnonzero(~np.isnan(hourly_means[i]))
         
-        ax.plot(hourly_fof2.index, hourly_fof2.values,
+        ax.plot(hours, hourly_means[i, hours],
                 color=colors[i % len(colors)], marker='o', linewidth=2, markersize=4,
-                label=f'{int(year)}')
+                label=f'{int(year)}', rasterized=True)
     
     # Formatting
     ax.set_title("Hourly Patterns (24h Diurnal Cycle)",
@@ -126,8 +135,7 @@ def plot_corrected_statistical_distribution(ax, df, year_columns, colors, statio
     year_labels = []
     
     for year in year_columns:
-        df_year = df.dropna(subset=[year])
-        fof2_values = calculate_fof2_from_signal_correct(df_year[year], station, period)
+        fof2_values = calculate_fof2_from_signal_correct(df[year].dropna(), station, period)
         fof2_data.append(fof2_values)
         year_labels.append(f'{int(year)}')
     
@@ -152,47 +160,44 @@ def plot_corrected_temporal_progression(ax, df, year_columns, colors, station, p
         title = "24-hour foF2 Progression"
         xlabel = "Hour of Day"
         
+        # Time of day is the same for every year: derive it once, then mask per year
+        hour_decimal_all = (df['DateTime'].dt.hour + df['DateTime'].dt.minute / 60.0).to_numpy()
         for i, year in enumerate(year_columns):
-            df_year = df.dropna(subset=[year]).copy()
-            df_year['Hour'] = df_year['DateTime'].dt.hour
-            df_year['Minute'] = df_year['DateTime'].dt.minute
-            df_year['HourDecimal'] = df_year['Hour'] + df_year['Minute'] / 60.0
-            df_year['foF2_estimated'] = calculate_fof2_from_signal_correct(df_year[year], station, period)
-            df_year = df_year.sort_values('HourDecimal')
+            signal = df[year].to_numpy(dtype=np.float64)
+            mask = ~np.isnan(signal)
+            hour_decimal = hour_decimal_all[mask]
+            fof2 = calculate_fof2_from_signal_correct(signal[mask], station, period)
+            order = np.argsort(hour_decimal, kind='stable')
             
-            ax.plot(df_year['HourDecimal'], df_year['foF2_estimated'],
+            ax.plot(hour_decimal[order], fof2[order],
                     color=colors[i % len(colors)], marker='o', linewidth=2, markersize=3,
-                    label=f'{int(year)}')
+                    label=f'{int(year)}', rasterized=True)
     
     elif period_type == "daily":
         # Daily progression for period analysis
         title = "Daily Average foF2 Progression"
         xlabel = "Day of Period"
         
+        daily_means = mean_fof2_by_year(df, year_columns, station, period, 'day', minlength=32)
         for i, year in enumerate(year_columns):
-            df_year = df.dropna(subset=[year]).copy()
-            df_year['Day'] = df_year['DateTime'].dt.day
-            df_year['foF2_estimated'] = calculate_fof2_from_signal_correct(df_year[year], station, period)
-            daily_fof2 = df_year.groupby('Day')['foF2_estimated'].mean()
+            days = np.flatnonzero(~np.isnan(daily_means[i]))
             
-            ax.plot(daily_fof2.index, daily_fof2.values,
+            ax.plot(days, daily_means[i, days],
                     color=colors[i % len(colors)], marker='o', linewidth=2, markersize=4,
-                    label=f'{int(year)}')
+                    label=f'{int(year)}', rasterized=True)
     
     else:  # monthly
         # Monthly progression for full month analysis
         title = "Daily Average foF2 Progression (Full Month)"
         xlabel = "Day of April"
         
+        daily_means = mean_fof2_by_year(df, year_columns, station, period, 'day', minlength=32)
         for i, year in enumerate(year_columns):
-            df_year = df.dropna(subset=[year]).copy()
-            df_year['Day'] = df_year['DateTime'].dt.day
-            df_year['foF2_estimated'] = calculate_fof2_from_signal_correct(df_year[year], station, period)
-            daily_fof2 = df_year.groupby('Day')['foF2_estimated'].mean()
+            days = np.flatnonzero(~np.isnan(daily_means[i]))
             
-            ax.plot(daily_fof2.index, daily_fof2.values,
+            ax.plot(days, daily_means[i, days],
                     color=colors[i % len(colors)], marker='o', linewidth=2, markersize=4,
-                    label=f'{int(year)}')
+                    label=f'{int(year)}', rasterized=True)
     
     # Formatting
     ax.set_title(title, fontsize=STANDARD_LAYOUT['subtitle_fontsize'], fontweight='bold')
@@ -204,16 +209,13 @@ def plot_corrected_temporal_progression(ax, df, year_columns, colors, station, p
 def plot_corrected_nvis_frequency_bands(ax, df, year_columns, station, period):
     """Plot NVIS frequency bands with correct foF2 calculations"""
     
-    # Calculate average foF2 across all years and data
-    all_fof2_values = []
-    for year in year_columns:
-        df_year = df.dropna(subset=[year])
-        fof2_values = calculate_fof2_from_signal_correct(df_year[year], station, period)
-        all_fof2_values.extend(fof2_values)
+    # Calculate average foF2 across all years and data (one array, one foF2 pass)
+    signal = df[year_columns].to_numpy(dtype=np.float64).ravel()
+    all_fof2_values = calculate_fof2_from_signal_correct(signal[~np.isnan(signal)], station, period)
     
-    if all_fof2_values:
-        avg_fof2 = np.mean(all_fof2_values)
-        std_fof2 = np.std(all_fof2_values)
+    if all_fof2_values.size:
+        avg_fof2 = all_fof2_values.mean()
+        std_fof2 = all_fof2_values.std()
         muf = avg_fof2 * 3.0  # Maximum Usable Frequency
     else:
         avg_fof2, std_fof2, muf = 10.0, 2.0, 30.0
@@ -251,28 +253,8 @@ def load_station_data(station_name, period_filter="April 15-28"):
         return None
     
     try:
-        # Load real data
-        df_raw = pd.read_excel(NVIS_DATA_FILE, sheet_name=station_name, header=None)
-        
-        # Find header row
-        header_row = None
-        for idx, row in df_raw.iterrows():
-            if 'DATE' in str(row.values) and 'TIME' in str(row.values):
-                header_row = idx
-                break
-        
-        if header_row is None:
-            raise Exception("Header row not found")
-        
-        # Read with proper header
-        df = pd.read_excel(NVIS_DATA_FILE, sheet_name=station_name, header=header_row)
-        df = df.dropna(how='all')
-        
-        # Create DateTime column
-        if 'DATE' in df.columns and 'TIME' in df.columns:
-            df['DateTime'] = pd.to_datetime(df['DATE'].astype(str) + ' ' + df['TIME'].astype(str), 
-                                          errors='coerce')
-            df = df.dropna(subset=['DateTime'])
+        # Load real data (parsed once per sheet; the filter below returns a new frame)
+        df, year_columns = load_sheet(NVIS_DATA_FILE, station_name)
         
         # Apply period filtering
         if "15th" in period_filter:
@@ -284,12 +266,6 @@ def load_station_data(station_name, period_filter="April 15-28"):
         else:  # Full April
             df = df[df['DateTime'].dt.month == 4]
         
-        # Find year columns
-        year_columns = []
-        for col in df.columns:
-            if str(col).isdigit() and 2017 <= int(col) <= 2023:
-                year_columns.append(int(col))
-        
         print(f"✅ Loaded {station_name} {period_filter} data: {len(df)} records, years: {year_columns}")
         
         return {
@@ -302,6 +278,55 @@ def load_station_data(station_name, period_filter="April 15-28"):
         print(f"⚠️ Error loading {station_name} data: {e}")
         return None
 
+def _render_one(job):
+    """Render and save one chart from a (config, loaded data) pair; returns the filename"""
+    config, data = job
+    df = data['data']
+    year_columns = data['year_columns']
+    colors = STANDARD_LAYOUT['colors']
+    
+    # Create chart
+    fig, axes = create_corrected_chart(config['station'], config['period'], "2017-2023")
+    
+    # Plot each panel with correct calculations
+    plot_corrected_hourly_patterns(axes[0, 0], df, year_columns, colors, config['station'], config['period'])
+    plot_corrected_statistical_distribution(axes[0, 1], df, year_columns, colors, config['station'], config['period'])
+    plot_corrected_temporal_progression(axes[1, 0], df, year_columns, colors, config['station'], config['period'], config['period_type'])
+    plot_corrected_nvis_frequency_bands(axes[1, 1], df, year_columns, config['station'], config['period'])
+    
+    # Apply layout and save
+    plt.tight_layout()
+    plt.subplots_adjust(top=0.88, hspace=0.4, wspace=0.3)
+    
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filename = f"new_standard_{config['filename']}_{timestamp}.png"
+    full_path = os.path.join(CORRECTED_FOLDER, filename)
+    
+    # Fixed 16x12 canvas: the layout above already sets the margins, so no tight-bbox pass
+    plt.savefig(full_path, dpi=160)
+    plt.close(fig)
+    return filename
+
+def render_charts(jobs):
+    """
+    Render the charts in parallel worker processes; if the pool itself fails (a worker dies
+    or processes cannot be started), only the charts it did not finish are rendered serially
+    """
+    pending = dict(enumerate(jobs))
+    workers = min(len(pending), os.cpu_count() or 1)
+    if workers >= 2:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                futures = {ex.submit(_render_one, job): i for i, job in pending.items()}
+                for future in as_completed(futures):
+                    print(f"✅ Saved corrected chart: {future.result()}")
+                    del pending[futures[future]]
+        except (BrokenProcessPool, OSError) as e:
+            print(f"⚠️ Parallel rendering failed, rendering {len(pending)} remaining chart(s) serially: {e}")
+    
+    for job in pending.values():
+        print(f"✅ Saved corrected chart: {_render_one(job)}")
+
 def main():
     """Generate corrected charts with proper foF2 calculations"""
     
@@ -313,7 +338,7 @@ def main():
     print()
     
     # Create corrected folder
-    corrected_folder = "output/corrected"
+    corrected_folder = CORRECTED_FOLDER
     if not os.path.exists(corrected_folder):
         os.makedirs(corrected_folder)
         print(f"📁 Created corrected folder: {corrected_folder}")
@@ -358,41 +383,17 @@ def main():
         }
     ]
 
-    # Generate each chart
+    # Load data in this process (each sheet is parsed once), then render the charts in parallel
+    jobs = []
     for i, config in enumerate(chart_configs, 1):
         print(f"\n[{i}/6] {config['station']} - {config['period']}")
-        
-        # Load data
         data = load_station_data(config['station'], config['period'])
         if not data:
             print(f"❌ Failed to load data for {config['station']} {config['period']}")
             continue
-        
-        df = data['data']
-        year_columns = data['year_columns']
-        colors = STANDARD_LAYOUT['colors']
-        
-        # Create chart
-        fig, axes = create_corrected_chart(config['station'], config['period'], "2017-2023")
-        
-        # Plot each panel with correct calculations
-        plot_corrected_hourly_patterns(axes[0, 0], df, year_columns, colors, config['station'], config['period'])
-        plot_corrected_statistical_distribution(axes[0, 1], df, year_columns, colors, config['station'], config['period'])
-        plot_corrected_temporal_progression(axes[1, 0], df, year_columns, colors, config['station'], config['period'], config['period_type'])
-        plot_corrected_nvis_frequency_bands(axes[1, 1], df, year_columns, config['station'], config['period'])
-        
-        # Apply layout and save
-        plt.tight_layout()
-        plt.subplots_adjust(top=0.88, hspace=0.4, wspace=0.3)
-        
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"new_standard_{config['filename']}_{timestamp}.png"
-        full_path = os.path.join(corrected_folder, filename)
-        
-        plt.savefig(full_path, dpi=160, bbox_inches='tight')
-        print(f"✅ Saved corrected chart: {filename}")
-        
-        plt.close()
+        jobs.append((config, data))
+    
+    render_charts(jobs)
     
     print(f"\n🎉 ALL 6 CORRECTED CHARTS GENERATED!")
     print("="*40)
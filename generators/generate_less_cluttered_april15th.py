@@ -22,9 +22,17 @@ import sys
 # Import the standardized layout enforcer
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from standardized_layout_enforcer import *
+from data_utils import load_sheet
+
+# Optional: Numba JIT for the heatmap matrix on large (multi-year, minute-resolution) inputs
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 # Configuration
 NVIS_DATA_FILE = "data/NVIS_data.xlsx"
+NUMBA_MIN_SAMPLES = 100_000  # below this the NumPy bincount is as fast as the JIT kernel
 
 def plot_less_cluttered_temporal_progression(ax, df, year_columns, colors, title="24-hour foF2 Progression"):
     """
@@ -46,19 +54,20 @@ def plot_less_cluttered_temporal_progression(ax, df, year_columns, colors, title
     selected_years = [year_columns[0], year_columns[2], year_columns[4], year_columns[6]]  # Every other year
     line_styles = ['-', '--', '-.', ':']
     
+    # Hour of day is the same for every year: derive it once, then mask per year
+    hours_all = df['DateTime'].dt.hour.to_numpy()
+    
     for i, year in enumerate(selected_years):
         if year in year_columns:
-            df_year = df.dropna(subset=[year]).copy()
-            df_year['Hour'] = df_year['DateTime'].dt.hour
-            df_year['Minute'] = df_year['DateTime'].dt.minute
-            df_year['HourDecimal'] = df_year['Hour'] + df_year['Minute'] / 60.0
-            df_year['foF2_estimated'] = calculate_fof2_from_signal(df_year[year])
+            signal = df[year].to_numpy(dtype=np.float64)
+            mask = ~np.isnan(signal)
+            fof2 = calculate_fof2_from_signal(signal[mask])
             
             # Group by hour and take mean to reduce data points
-            hourly_data = df_year.groupby('Hour')['foF2_estimated'].agg(['mean', 'std']).reset_index()
+            hourly_data = pd.Series(fof2).groupby(hours_all[mask]).agg(['mean', 'std'])
             
             # Plot with error bars for variability
-            ax.errorbar(hourly_data['Hour'], hourly_data['mean'], 
+            ax.errorbar(hourly_data.index, hourly_data['mean'], 
                        yerr=hourly_data['std'], 
                        color=colors[year_columns.index(year) % len(colors)], 
                        linestyle=line_styles[i % len(line_styles)],
@@ -67,7 +76,8 @@ def plot_less_cluttered_temporal_progression(ax, df, year_columns, colors, title
                        markersize=5,
                        capsize=3,
                        alpha=0.8,
-                       label=f'{int(year)}')
+                       label=f'{int(year)}',
+                       rasterized=True)
     
     ax.set_xlim(0, 23)
     ax.set_xticks(range(0, 24, 3))
@@ -79,6 +89,36 @@ def plot_less_cluttered_temporal_progression(ax, df, year_columns, colors, title
             verticalalignment='top', alpha=0.7,
             bbox=dict(boxstyle='round,pad=0.3', facecolor='white', alpha=0.8))
 
+def hourly_heat_matrix(df, year_columns):
+    """(years, 24) mean foF2 per year and hour of day, NaN for hours without data"""
+    signals = df[year_columns].to_numpy(dtype=np.float64)
+    hours = df['DateTime'].dt.hour.to_numpy()
+    rows, year_idx = np.nonzero(~np.isnan(signals))
+    signal, hour = signals[rows, year_idx], hours[rows]
+    
+    n_years = len(year_columns)
+    if njit is not None and signal.size >= NUMBA_MIN_SAMPLES:
+        out_sum = np.zeros((n_years, 24))
+        out_cnt = np.zeros((n_years, 24), dtype=np.int64)
+        _build_heat(year_idx, hour, signal, *fof2_params("Guam", "April"), out_sum, out_cnt)
+    else:
+        bins = year_idx * 24 + hour
+        out_cnt = np.bincount(bins, minlength=n_years * 24).reshape(n_years, 24)
+        out_sum = np.bincount(bins, weights=calculate_fof2_from_signal(signal),
+                              minlength=n_years * 24).reshape(n_years, 24)
+    with np.errstate(invalid='ignore'):
+        return out_sum / out_cnt
+
+if njit is not None:
+    @njit(cache=True)
+    def _build_heat(year_idx, hour, signal, baseline_fof2, scale_factor, min_fof2, max_fof2, out_sum, out_cnt):
+        """foF2 estimate fused with the per-(year, hour) sum and count; one pass, no temporaries"""
+        for i in range(signal.size):
+            v = baseline_fof2 + signal[i] / scale_factor
+            v = min_fof2 if v < min_fof2 else (max_fof2 if v > max_fof2 else v)
+            out_sum[year_idx[i], hour[i]] += v
+            out_cnt[year_idx[i], hour[i]] += 1
+
 def plot_alternative_temporal_progression(ax, df, year_columns, colors, title="24-hour foF2 Progression"):
     """
     Alternative approach: Heat map style visualization
@@ -88,24 +128,8 @@ def plot_alternative_temporal_progression(ax, df, year_columns, colors, title="2
     ax.set_xlabel('Hour of Day', fontsize=STANDARD_LAYOUT['label_fontsize'])
     ax.set_ylabel('Year', fontsize=STANDARD_LAYOUT['label_fontsize'])
     
-    # Create matrix for heatmap
-    hours = range(24)
-    heat_data = []
-    
-    for year in year_columns:
-        df_year = df.dropna(subset=[year]).copy()
-        df_year['Hour'] = df_year['DateTime'].dt.hour
-        df_year['foF2_estimated'] = calculate_fof2_from_signal(df_year[year])
-        hourly_avg = df_year.groupby('Hour')['foF2_estimated'].mean()
-        
-        # Fill missing hours with NaN
-        year_data = []
-        for hour in hours:
-            if hour in hourly_avg.index:
-                year_data.append(hourly_avg[hour])
-            else:
-                year_data.append(np.nan)
-        heat_data.append(year_data)
+    # Create matrix for heatmap (years x 24 hours, NaN for missing hours)
+    heat_data = hourly_heat_matrix(df, year_columns)
     
     # Create heatmap
     im = ax.imshow(heat_data, cmap='viridis', aspect='auto', interpolation='nearest')
@@ -130,38 +154,12 @@ def load_station_data(station_name):
         return create_synthetic_data()
     
     try:
-        # Load real data
-        df_raw = pd.read_excel(NVIS_DATA_FILE, sheet_name=station_name, header=None)
-        
-        # Find header row
-        header_row = None
-        for idx, row in df_raw.iterrows():
-            if 'DATE' in str(row.values) and 'TIME' in str(row.values):
-                header_row = idx
-                break
-        
-        if header_row is None:
-            raise Exception("Header row not found")
-        
-        # Read with proper header
-        df = pd.read_excel(NVIS_DATA_FILE, sheet_name=station_name, header=header_row)
-        df = df.dropna(how='all')
-        
-        # Create DateTime column
-        if 'DATE' in df.columns and 'TIME' in df.columns:
-            df['DateTime'] = pd.to_datetime(df['DATE'].astype(str) + ' ' + df['TIME'].astype(str), 
-                                          errors='coerce')
-            df = df.dropna(subset=['DateTime'])
+        # Load real data (parsed once per sheet; the filter below returns a new frame)
+        df, year_columns = load_sheet(NVIS_DATA_FILE, station_name)
         
         # Filter for April 15th only
         df = df[(df['DateTime'].dt.month == 4) & (df['DateTime'].dt.day == 15)]
         
-        # Find year columns
-        year_columns = []
-        for col in df.columns:
-            if str(col).isdigit() and 2017 <= int(col) <= 2023:
-                year_columns.append(int(col))
-        
         print(f"✅ Loaded {station_name} April 15th data: {len(df)} records, years: {year_columns}")
         
         return {
@@ -208,13 +206,17 @@ def create_less_cluttered_april15th_chart(station_name, data, visualization_type
     year_columns = data['year_columns']
     colors = STANDARD_LAYOUT['colors']
     
+    # Convert to NumPy arrays once; these and foF2 per year are shared by the standard panels
+    chart_data = ChartData.from_df(df, year_columns)
+    fof2_cache = precompute_fof2(df, year_columns)
+    
     # Create standardized chart
     fig, axes = create_standardized_chart(station_name, "April 15th", "2017-2023")
     
     # Plot standard panels (unchanged)
-    plot_hourly_patterns(axes[0, 0], df, year_columns, colors)
-    plot_statistical_distribution(axes[0, 1], df, year_columns, colors)
-    plot_nvis_frequency_bands(axes[1, 1], df, year_columns)
+    plot_hourly_patterns(axes[0, 0], chart_data, year_columns, colors, fof2_cache=fof2_cache)
+    plot_statistical_distribution(axes[0, 1], chart_data, year_columns, colors, fof2_cache=fof2_cache)
+    plot_nvis_frequency_bands(axes[1, 1], chart_data, year_columns, fof2_cache=fof2_cache)
     
     # Plot less cluttered temporal progression
     if visualization_type == "heatmap":
@@ -238,7 +240,8 @@ def create_less_cluttered_april15th_chart(station_name, data, visualization_type
     filename = f"new_standard_{station_name}_April_15th_{viz_suffix}_{timestamp}.png"
     full_path = os.path.join(test2_folder, filename)
     
-    plt.savefig(full_path, dpi=160, bbox_inches='tight')
+    # Fixed 16x12 canvas: apply_standardized_layout sets the margins, so no tight-bbox pass
+    plt.savefig(full_path, dpi=160)
     print(f"✅ Saved to test2 folder: {filename}")
     print(f"📁 Full path: {full_path}")
     
@@ -161,8 +161,8 @@ def create_synthetic_data():
         'source': 'synthetic'
     }
 
-def create_standardized_chart_with_data(station, period, data, filename):
-    """Create a standardized chart with specific data"""
+def create_standardized_chart_with_data(station, period, data, filename, canvas=None):
+    """Create a standardized chart with specific data (drawn on canvas if given)"""
     
     print(f"📈 Creating {station} {period} chart...")
     
@@ -170,12 +170,9 @@ def create_standardized_chart_with_data(station, period, data, filename):
     year_columns = data['year_columns']
     colors = STANDARD_LAYOUT['colors']
     
-    # Create standardized chart
-    fig, axes = create_standardized_chart(station, period, "2017-2023")
-    
-    # Plot each panel using standardized functions
-    plot_hourly_patterns(axes[0, 0], df, year_columns, colors)
-    plot_statistical_distribution(axes[0, 1], df, year_columns, colors)
+    # Convert to NumPy arrays once; these and foF2 per year are shared by all four panels
+    chart_data = ChartData.from_df(df, year_columns)
+    fof2_cache = precompute_fof2(df, year_columns)
     
     # Determine period type for temporal progression
     if "15th" in period:
@@ -185,8 +182,17 @@ def create_standardized_chart_with_data(station, period, data, filename):
     else:
         period_type = "monthly"
     
-    plot_temporal_progression(axes[1, 0], df, year_columns, colors, period_type=period_type)
-    plot_nvis_frequency_bands(axes[1, 1], df, year_columns)
+    # Create standardized chart; a single-day progression shares the hourly x axis
+    fig, axes = create_standardized_chart(station, period, "2017-2023", canvas=canvas,
+                                          share_hours=(period_type == "single_day"))
+    
+    # Plot each panel using standardized functions
+    plot_hourly_patterns(axes[0, 0], chart_data, year_columns, colors, fof2_cache=fof2_cache)
+    plot_statistical_distribution(axes[0, 1], chart_data, year_columns, colors, fof2_cache=fof2_cache)
+    
+    plot_temporal_progression(axes[1, 0], chart_data, year_columns, colors, period_type=period_type,
+                              fof2_cache=fof2_cache)
+    plot_nvis_frequency_bands(axes[1, 1], chart_data, year_columns, fof2_cache=fof2_cache)
     
     # Apply standardized layout
     apply_standardized_layout(fig)
@@ -194,7 +200,9 @@ def create_standardized_chart_with_data(station, period, data, filename):
     # Save to test folder
     save_standardized_chart(fig, filename)
     
-    plt.close()
+    # A shared canvas is cleared and reused for the next chart
+    if canvas is None:
+        plt.close(fig)
 
 def generate_all_six_charts():
     """Generate all 6 standardized charts"""
@@ -257,15 +265,18 @@ def generate_all_six_charts():
         }
     ]
     
-    # Generate each chart
+    # Generate each chart on one reusable figure
+    canvas = ChartCanvas()
     for i, config in enumerate(chart_configs, 1):
         print(f"\n[{i}/6] {config['station']} - {config['period']}")
         create_standardized_chart_with_data(
             config['station'],
             config['period'],
             config['data'],
-            config['filename']
+            config['filename'],
+            canvas=canvas
         )
+    canvas.close()
     
     print(f"\n🎉 ALL 6 STANDARDIZED CHARTS GENERATED!")
     print("="*45)
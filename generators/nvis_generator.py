@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NVIS Frequency Analysis Generator (Figures 14 and 15)
+=====================================================
+
+Generates the per-frequency NVIS propagation analysis charts for Paper 2
+(24-hour SNR, best continuous period and, for 10.130 MHz, power efficiency).
+One NVISConfig per frequency; fig14/fig15 scripts are thin wrappers around run().
+Based on field trial data from DGFC Borneo operations.
+
+Author: Research Team
+License: MIT
+"""
+
+import pandas as pd
+import numpy as np
+import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+from matplotlib.collections import PolyCollection
+from dataclasses import dataclass
+from functools import lru_cache
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from data_utils import cache_df
+
+# Optional: schema-only peek at Parquet sources (they are read in full otherwise)
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+# Optional: Rust-based calamine reader for the workbook (pandas' default openpyxl otherwise)
+try:
+    import python_calamine
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = None
+
+# Optional: Numba engine for the moving average on very long series
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Configuration
+OUTPUT_DIR = 'output'
+CACHE_DIR = '.cache'
+NUMBA_MIN_SAMPLES = 1_000_000   # below this pandas' Cython rolling kernel is faster
+PLOT_MAX_POINTS = 4000          # longer raw series are binned before plotting (about one point per pixel)
+SOURCE_ENV = 'BEARWAVE_SOURCE'   # alternative data file (.xlsx or pre-converted .parquet)
+PARQUET_COLUMNS = ['DateTime', 'SNR_DB', 'Band', 'Node']      # read from an already-cleaned Parquet source
+# Fast zlib level for the 300 dpi PNGs (default 6 is several times slower for a slightly smaller file)
+SAVE_ARGS = dict(dpi=300, bbox_inches='tight', pil_kwargs={'compress_level': 1})
+CATEGORY_COLUMNS = ['Band', 'Node', 'Locator', 'Frequency']   # low-cardinality labels, stored dictionary-encoded
+
+@dataclass(frozen=True)
+class NVISConfig:
+    """Everything that differs between the per-frequency figures (frozen so it can key the load cache)"""
+    frequency: str           # label in titles and file names
+    band: str                # short name in progress messages
+    power: str
+    power_watts: float
+    file_path: str
+    column_names: tuple      # workbook column layout
+    sheet_name: str
+    header: object           # header row of that sheet (None if it has none)
+    window_24h: tuple        # (start, end) of the 24-hour analysis, end exclusive
+    window_best: tuple       # (start, end) of the best continuous period, end inclusive
+    color: str
+    best_hour_interval: int  # hours between best-period x ticks
+    power_efficiency: bool = False
+    
+    @property
+    def file_prefix(self):
+        """Frequency label as used in output file names, e.g. 7_078_MHz"""
+        return self.frequency.replace(" ", "_").replace(".", "_")
+    
+    @property
+    def excel_read_args(self):
+        """read_excel arguments; columns are named on read, SNR stays untyped (stray text rows are coerced later)"""
+        return dict(engine=EXCEL_ENGINE, usecols=range(len(self.column_names)), names=list(self.column_names),
+                    dtype={'Band': 'string', 'Node': 'string', 'Locator': 'string'})
+
+FIG14 = NVISConfig(
+    frequency='7.078 MHz', band='7.1 MHz', power='5 W', power_watts=5,
+    file_path='data/7_1_MHz_Standardized_data.xlsx',
+    column_names=('Date', 'Time', 'Raw_SNR', 'SNR', 'Frequency', 'Offset',
+                  'Band', 'Node', 'ID', 'Message', 'Locator'),
+    sheet_name='final', header=0,
+    window_24h=('2023-04-18 00:00:00', '2023-04-19 00:00:00'),
+    window_best=('2023-04-18 02:16:00', '2023-04-18 22:51:15'),
+    color='darkblue', best_hour_interval=4)
+
+FIG15 = NVISConfig(
+    frequency='10.130 MHz', band='10.130 MHz', power='1 W', power_watts=1,
+    file_path='data/10_130_MHz_Standardized_data.xlsx',
+    column_names=('Date', 'Time', 'SNR', 'Offset', 'Frequency', 'Band',
+                  'Node', 'Unknown', 'ID', 'Message', 'Locator'),
+    sheet_name='final ', header=None,   # note the space; this sheet has no header row
+    window_24h=('2023-04-20 00:00:00', '2023-04-21 00:00:00'),
+    window_best=('2023-04-20 02:25:00', '2023-04-20 17:35:45'),
+    color='darkgreen', best_hour_interval=2, power_efficiency=True)
+
+CONFIGS = {'fig14': FIG14, 'fig15': FIG15}
+
+def read_parquet_source(path):
+    """Read a Parquet source, projecting to the chart columns when it is already cleaned"""
+    columns = None
+    if pq is not None:
+        names = pq.read_schema(path).names
+        if all(col in names for col in PARQUET_COLUMNS[:2]):
+            columns = [col for col in PARQUET_COLUMNS if col in names]
+    return pd.read_parquet(path, columns=columns)
+
+@lru_cache(maxsize=4)
+def _load_cached(config, path, mtime):
+    """Load and clean one version of the data file (Parquet cache of workbooks between runs); mtime is the cache key"""
+    if path.endswith('.parquet'):
+        # Pre-converted data: no workbook parsing, and no cleaning if it is already clean
+        df = read_parquet_source(path)
+        print(f"✅ Loaded {len(df)} records from {path}")
+        if 'DateTime' in df.columns and 'SNR_DB' in df.columns:
+            return df
+        return clean_data(df)
+    
+    print(f"📊 Loading {config.band} data from {path}...")
+    try:
+        return read_workbook(path, config)
+    except Exception as e:
+        print(f"❌ Error loading file: {e}")
+        return pd.DataFrame()
+
+def clean_data(df):
+    """Drop incomplete and duplicate readings and add the DateTime and SNR_DB columns"""
+    # Clean data
+    df = df.dropna(subset=['Date', 'Time', 'SNR'])
+    
+    # Convert SNR to numeric
+    df['SNR'] = pd.to_numeric(df['SNR'], errors='coerce')
+    df = df.dropna(subset=['SNR'])
+    
+    # Create datetime column; read_excel already gives Date as datetime64, so add the
+    # time of day as a timedelta instead of re-parsing "date time" strings
+    if pd.api.types.is_datetime64_any_dtype(df['Date']):
+        df['DateTime'] = df['Date'].dt.normalize() + pd.to_timedelta(df['Time'].astype(str), errors='coerce')
+    else:
+        stamps = df['Date'].astype(str) + ' ' + df['Time'].astype(str)
+        df['DateTime'] = pd.to_datetime(stamps, format='%Y-%m-%d %H:%M:%S', errors='coerce', cache=True)
+        missed = df['DateTime'].isna()
+        if missed.any():  # other layouts still go through pandas' general parser
+            df.loc[missed, 'DateTime'] = pd.to_datetime(stamps[missed], errors='coerce')
+    df = df.dropna(subset=['DateTime'])
+    
+    # A repeated reading is the same timestamp and SNR; no need to hash the free-text columns
+    df = df.drop_duplicates(subset=['DateTime', 'SNR'])
+    
+    # Rename SNR column for consistency (float32 is ample for dB readings and halves the bytes scanned)
+    df['SNR_DB'] = df['SNR'].astype(np.float32)
+    
+    # Label columns as categoricals (Arrow dictionary arrays in the cache)
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            labels = df[col].infer_objects()
+            if not pd.api.types.is_numeric_dtype(labels):
+                labels = labels.astype('string')
+            df[col] = labels.astype('category')
+    
+    print(f"✅ Cleaned data: {len(df)} valid records")
+    return df
+
+@cache_df(CACHE_DIR, clean_data, CATEGORY_COLUMNS, NVISConfig.excel_read_args.fget, EXCEL_ENGINE)
+def read_workbook(path, config):
+    """Read one frequency's workbook as laid out in config and clean it (Parquet cache across runs)"""
+    read_args = config.excel_read_args
+    try:
+        df = pd.read_excel(path, sheet_name=config.sheet_name, header=config.header, **read_args)
+        print(f"✅ Loaded {len(df)} records from '{config.sheet_name}' sheet")
+    except:
+        # Try default sheet
+        df = pd.read_excel(path, **read_args)
+        print(f"✅ Loaded {len(df)} records from default sheet")
+    return clean_data(df)
+
+def load_and_clean_data(config, path=None):
+    """Load and clean one frequency's data, parsed at most once per version of the file in this process"""
+    path = path or config.file_path
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    # Shallow copy so columns added by the chart functions never reach the memoized frame
+    return _load_cached(config, path, mtime).copy(deep=False)
+
+def hourly_stats(times, snr):
+    """
+    Mean, std (ddof=1) and count of SNR per clock hour, for the hours that have data.
+    One integer hour id per sample and bincount sums replace a groupby over the labels.
+    """
+    hour_id = times.to_numpy(dtype='datetime64[h]').astype(np.int64)
+    base = hour_id.min() if len(hour_id) else 0
+    slot = hour_id - base
+    snr = np.asarray(snr, dtype=np.float64)
+    
+    counts = np.bincount(slot)
+    present = np.flatnonzero(counts)
+    means = np.bincount(slot, weights=snr)[present] / counts[present]
+    
+    # Two-pass variance (deviations from each hour's mean) for the same accuracy as pandas
+    slot_mean = np.zeros(len(counts))
+    slot_mean[present] = means
+    sq_dev = np.bincount(slot, weights=(snr - slot_mean[slot]) ** 2)[present]
+    n = counts[present]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std = np.where(n > 1, np.sqrt(sq_dev / (n - 1)), np.nan)
+    
+    hours = (present + base).astype('datetime64[h]').astype(times.dtype)
+    return pd.DataFrame({'Hour': hours, 'mean': means, 'std': std, 'count': n})
+
+def bin_series(x, y, n_bins):
+    """Split a series into n_bins equal-count bins; returns bin start x and per-bin mean, min, max of y"""
+    edges = np.linspace(0, len(y), n_bins + 1, dtype=int)
+    starts = np.unique(edges[:-1])
+    counts = np.diff(np.append(starts, len(y)))
+    y = np.asarray(y, dtype=np.float64)
+    return (np.asarray(x)[starts], np.add.reduceat(y, starts) / counts,
+            np.minimum.reduceat(y, starts), np.maximum.reduceat(y, starts))
+
+def snr_summary(snr):
+    """Mean, std (ddof=1), min and max of an SNR array, from one float64 copy and a shared mean"""
+    x = np.asarray(snr, dtype=np.float64)
+    n = x.size
+    mean = x.sum() / n
+    std = np.sqrt(np.square(x - mean).sum() / (n - 1)) if n > 1 else np.nan
+    return mean, std, x.min(), x.max()
+
+def prepare_axes(ax, figsize):
+    """Clear the shared axes for the next chart and resize its figure (new figure if ax is None)"""
+    if ax is None:
+        _, ax = plt.subplots(figsize=figsize)
+    else:
+        ax.clear()
+        ax.figure.set_size_inches(figsize)
+    return ax.figure, ax
+
+def generate_24hour_analysis(config, df, ax=None):
+    """Generate 24-hour SNR analysis"""
+    print("📊 Generating 24-hour analysis...")
+    
+    # Filter to best 24-hour period (based on your analysis)
+    start_time, end_time = config.window_24h
+    
+    df_24h = df[(df['DateTime'] >= start_time) & (df['DateTime'] < end_time)].copy()
+    
+    if len(df_24h) == 0:
+        print("⚠️ No data in specified 24-hour period, using all available data")
+        df_24h = df.copy()
+    
+    # Group by hour
+    hourly = hourly_stats(df_24h['DateTime'], df_24h['SNR_DB'])
+    
+    # Classify Day/Night (06:00-18:00 is Day)
+    h = hourly['Hour'].dt.hour.to_numpy()
+    is_day = (h >= 6) & (h < 18)
+    hourly['Period'] = np.where(is_day, 'Day', 'Night')
+    
+    # Calculate statistics
+    hourly_mean = hourly['mean'].to_numpy()
+    day_avg = hourly_mean[is_day].mean() if is_day.any() else 0
+    night_avg = hourly_mean[~is_day].mean() if (~is_day).any() else 0
+    overall_avg = hourly['mean'].mean()
+    
+    # Create plot
+    fig, ax = prepare_axes(ax, (14, 8))
+    
+    # Plot Day and Night separately
+    for period, mask, color in (('Day', is_day, 'orange'), ('Night', ~is_day, 'navy')):
+        if not mask.any():
+            continue
+        group = hourly[mask]
+        gx = mdates.date2num(group['Hour'].to_numpy())   # converted once for both artists
+        ax.plot(gx, group['mean'], marker='o', linestyle='-', 
+               label=f'{period} (avg: {group["mean"].mean():.1f} dB)', 
+               color=color, linewidth=2, markersize=6)
+        
+        # Add error bars
+        ax.errorbar(gx, group['mean'], yerr=group['std'], 
+                   color=color, alpha=0.3, capsize=3)
+    
+    # Formatting
+    ax.set_title(f'{config.frequency} @ {config.power} - 24-Hour SNR Analysis\n'
+                 f'Day Average: {day_avg:.1f} dB | Night Average: {night_avg:.1f} dB | '
+                 f'Overall: {overall_avg:.1f} dB', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Time (Hours)', fontsize=12)
+    ax.set_ylabel('Average SNR (dB)', fontsize=12)
+    ax.grid(True, alpha=0.3)
+    ax.legend(title='Period', fontsize=11)
+    
+    # Format x-axis
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
+    ax.xaxis.set_major_locator(mdates.HourLocator(interval=2))
+    plt.setp(ax.get_xticklabels(), rotation=45)
+    
+    fig.tight_layout()
+    
+    # Save
+    filename = f'{config.file_prefix}_24hour_analysis.png'
+    filepath = os.path.join(OUTPUT_DIR, filename)
+    fig.savefig(filepath, **SAVE_ARGS)
+    print(f"✅ Saved: {filename}")
+    
+    return hourly
+
+def generate_best_period_analysis(config, df, ax=None):
+    """Generate analysis of best continuous period"""
+    print("📊 Generating best period analysis...")
+    
+    # Best period based on your analysis
+    start_time, end_time = config.window_best
+    
+    df_best = df[(df['DateTime'] >= start_time) & (df['DateTime'] <= end_time)].copy()
+    
+    if len(df_best) == 0:
+        print("⚠️ No data in best period, using all available data")
+        df_best = df.copy()
+    
+    # Create time series plot
+    fig, ax = prepare_axes(ax, (16, 8))
+    
+    # Matplotlib date numbers, converted once and shared by every artist below
+    x_plot = mdates.date2num(df_best['DateTime'].to_numpy())
+    
+    # Plot SNR over time (long series as per-bin mean with a min-max band; same look at figure resolution)
+    if len(df_best) > PLOT_MAX_POINTS:
+        x_bins, snr_mean, snr_min, snr_max = bin_series(x_plot, df_best['SNR_DB'], PLOT_MAX_POINTS)
+        ax.plot(x_bins, snr_mean, color=config.color, alpha=0.7, linewidth=1)
+        ax.fill_between(x_bins, snr_min, snr_max, color=config.color, alpha=0.2, linewidth=0)
+    else:
+        ax.plot(x_plot, df_best['SNR_DB'], 
+                color=config.color, alpha=0.7, linewidth=1)
+    
+    # Add moving average
+    window = min(50, len(df_best) // 10)
+    if window > 1:
+        # Contiguous float64 keeps the rolling kernel on its fast path (no hidden copy)
+        snr = np.ascontiguousarray(df_best['SNR_DB'].to_numpy(dtype=np.float64))
+        df_best['SNR_DB'] = snr
+        if numba is not None and len(snr) >= NUMBA_MIN_SAMPLES:
+            rolling_mean = pd.Series(snr).rolling(window).mean(
+                engine='numba', engine_kwargs={'nopython': True, 'nogil': True})
+        else:
+            rolling_mean = pd.Series(snr).rolling(window).mean()
+        df_best['SNR_MA'] = rolling_mean.to_numpy()
+        ax.plot(x_plot, df_best['SNR_MA'], 
+               color='red', linewidth=2, label=f'{window}-point Moving Average')
+    
+    # Add day/night shading: one collection of 06:00-18:00 rectangles spanning the full
+    # axes height (x in data, y in axes coordinates, like axvspan)
+    days = pd.date_range(df_best['DateTime'].min().date(), 
+                         df_best['DateTime'].max().date(), freq='D')
+    day_starts = mdates.date2num(days + pd.Timedelta(hours=6))
+    day_ends = mdates.date2num(days + pd.Timedelta(hours=18))
+    verts = [[(x0, 0), (x0, 1), (x1, 1), (x1, 0)] for x0, x1 in zip(day_starts, day_ends)]
+    ax.add_collection(PolyCollection(verts, transform=ax.get_xaxis_transform(), facecolor='yellow',
+                                     edgecolor='yellow', alpha=0.1, label='Day'), autolim=False)
+    ax.dataLim.update_from_data_x(np.concatenate([day_starts, day_ends]), ignore=False)
+    ax.autoscale_view(scaley=False)
+    
+    # Statistics
+    avg_snr, std_snr, min_snr, max_snr = snr_summary(df_best['SNR_DB'])
+    duration = df_best['DateTime'].max() - df_best['DateTime'].min()
+    
+    ax.set_title(f'{config.frequency} @ {config.power} - Best Continuous Period Analysis\n'
+                 f'Duration: {duration} | Avg: {avg_snr:.1f}±{std_snr:.1f} dB | '
+                 f'Range: {min_snr:.1f} to {max_snr:.1f} dB | N={len(df_best)}', 
+                 fontsize=14, fontweight='bold')
+    ax.set_xlabel('Time', fontsize=12)
+    ax.set_ylabel('SNR (dB)', fontsize=12)
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+    
+    # Format x-axis
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%m-%d %H:%M'))
+    ax.xaxis.set_major_locator(mdates.HourLocator(interval=config.best_hour_interval))
+    plt.setp(ax.get_xticklabels(), rotation=45)
+    
+    fig.tight_layout()
+    
+    # Save
+    filename = f'{config.file_prefix}_best_period_analysis.png'
+    filepath = os.path.join(OUTPUT_DIR, filename)
+    fig.savefig(filepath, **SAVE_ARGS)
+    print(f"✅ Saved: {filename}")
+    
+    return df_best
+
+def generate_power_efficiency_analysis(config, df, ax=None):
+    """Generate power efficiency analysis comparing to other frequencies"""
+    print("📊 Generating power efficiency analysis...")
+    
+    # Calculate SNR per watt efficiency
+    avg_snr = df['SNR_DB'].mean()
+    efficiency = avg_snr / config.power_watts
+    
+    fig, ax = prepare_axes(ax, (12, 8))
+    
+    # Create histogram of SNR values (50 equal-width bins over the data range, as bins=50 would give)
+    snr = df['SNR_DB'].to_numpy()
+    lo, hi = np.nanmin(snr), np.nanmax(snr)
+    if lo == hi:
+        lo, hi = lo - 0.5, hi + 0.5
+    edges = np.linspace(lo, hi, 51)
+    ax.hist(snr, bins=edges, alpha=0.7, color=config.color, edgecolor='black')
+    
+    # Add statistics lines
+    ax.axvline(avg_snr, color='red', linestyle='--', linewidth=2, 
+               label=f'Mean: {avg_snr:.1f} dB')
+    ax.axvline(df['SNR_DB'].median(), color='orange', linestyle='--', linewidth=2,
+               label=f'Median: {df["SNR_DB"].median():.1f} dB')
+    
+    ax.set_title(f'{config.frequency} @ {config.power} - SNR Distribution & Power Efficiency\n'
+                 f'Efficiency: {efficiency:.1f} dB/W | Total Measurements: {len(df)}', 
+                 fontsize=14, fontweight='bold')
+    ax.set_xlabel('SNR (dB)', fontsize=12)
+    ax.set_ylabel('Frequency', fontsize=12)
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+    
+    fig.tight_layout()
+    
+    # Save
+    filename = f'{config.file_prefix}_power_efficiency.png'
+    filepath = os.path.join(OUTPUT_DIR, filename)
+    fig.savefig(filepath, **SAVE_ARGS)
+    print(f"✅ Saved: {filename}")
+
+def run(config, source=None):
+    """Generate all charts for one frequency (source: data file, defaults to $BEARWAVE_SOURCE or the config's)"""
+    print(f"🎯 GENERATING {config.frequency} ANALYSIS CHARTS")
+    print("=" * 50)
+    
+    # Create output directory
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    
+    # Load and process data
+    df = load_and_clean_data(config, source or os.environ.get(SOURCE_ENV, config.file_path))
+    
+    if len(df) == 0:
+        print("❌ No data loaded, exiting...")
+        return
+    
+    # Generate analyses on one reused figure, closed once all charts are saved
+    fig, ax = plt.subplots(figsize=(16, 8))
+    hourly_data = generate_24hour_analysis(config, df, ax)
+    best_period_data = generate_best_period_analysis(config, df, ax)
+    if config.power_efficiency:
+        generate_power_efficiency_analysis(config, df, ax)
+    plt.close(fig)
+    
+    print(f"\n🎉 {config.band} ANALYSIS COMPLETE!")
+    print(f"📁 Charts saved to: {OUTPUT_DIR}/")
+    print(f"📊 Total data points analyzed: {len(df)}")
+    print(f"📅 Date range: {df['DateTime'].min()} to {df['DateTime'].max()}")
+
+def cli(config):
+    """Command-line entry point of a single-frequency figure script"""
+    parser = argparse.ArgumentParser(description=f'{config.frequency} NVIS analysis charts')
+    parser.add_argument('--source', help='data file to analyse (.xlsx, or .parquet to skip the workbook)')
+    run(config, parser.parse_args().source)
+
+def main():
+    """Generate every configured figure in one process (imports, caches and compiled kernels are shared)"""
+    parser = argparse.ArgumentParser(description='NVIS frequency analysis charts')
+    parser.add_argument('figures', nargs='*', help=f"figures to generate: {', '.join(CONFIGS)} (default: all)")
+    figures = parser.parse_args().figures or list(CONFIGS)
+    unknown = [name for name in figures if name not in CONFIGS]
+    if unknown:
+        parser.error(f"unknown figure(s): {', '.join(unknown)}")
+    for name in figures:
+        run(CONFIGS[name])
+
+if __name__ == "__main__":
+    main()